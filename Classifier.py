@@ -1,31 +1,31 @@
 import pandas as pd
 
+from data_store import load_dataset
+
 pd.set_option('display.max_rows', None)
 pd.set_option('display.max_columns', None)
 
 # Read the CSV file into a DataFrame
-df = pd.read_csv('DATA/infrastructure_deliverables.csv')
+df = load_dataset('DATA/infrastructure_deliverables.csv')
 
 # Display the first 5 rows
 print(df.head().to_markdown(index=False, numalign="left", stralign="left"))
 
 # Print the column names and their data types
 print(df.info())
-from sklearn.preprocessing import OneHotEncoder
+from generators.features import FeatureBuilder
 
 # Drop the `Start Date`, `End Date` and `Settlement Name` columns
 df.drop(['Start Date', 'End Date', 'Settlement Name'], axis=1, inplace=True)
 
-# One-hot encode categorical columns
-encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
-encoded_cols = encoder.fit_transform(df[['Project Type', 'Project Status', 'Infrastructure Level', 'Population Density', 'Growth Rate']])
-encoded_df = pd.DataFrame(encoded_cols, columns=encoder.get_feature_names_out(['Project Type', 'Project Status', 'Infrastructure Level', 'Population Density', 'Growth Rate']))
-
-# Concatenate the encoded columns with the original DataFrame
-df = pd.concat([df.drop(['Project Type', 'Project Status', 'Infrastructure Level', 'Population Density', 'Growth Rate'], axis=1), encoded_df], axis=1)
+# One-hot encode categorical columns straight into a sparse matrix. `Project Status` is what
+# we predict, so it is not a feature.
+encoder = FeatureBuilder(categorical=['Project Type', 'Infrastructure Level', 'Population Density', 'Growth Rate'],
+                         numeric=['Completion Percentage', 'Project Budget (KES)'], scale_numeric=False)
+encoded_delay = encoder.fit_transform_sparse(df)
 
 # Create a new target variable `is_delayed` which is 1 if `Project Status` is 'Delayed' and 0 otherwise
-df['is_delayed'] = df['Project Status_Delayed'].astype(int)
+df['is_delayed'] = (df['Project Status'] == 'Delayed').astype(int)
 #Now we will split the data into features (X) and target variable (Need New Infrastructure) then split the data
 #into training and testing sets. We will then initialize and train a Random Forest Classifier model to predict the need
 #for new infrastructure and evaluate the model on the test set.
@@ -35,7 +35,7 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
 # Split the data into features and target variable for predicting project delays
-X_delay = df.drop(['Need New Infrastructure', 'is_delayed', 'Project Status_Completed', 'Project Status_Delayed', 'Project Status_In Progress', 'Project Status_Not Started'], axis=1)
+X_delay = encoded_delay.toarray()
 y_delay = df['is_delayed']
 
 # Split the data into training and testing sets for predicting project delays
@@ -58,8 +58,8 @@ print(f"Accuracy for predicting project delays: {accuracy_delay}")
 print("Classification Report for predicting project delays:\n", report_delay)
 print("Confusion Matrix for predicting project delays:\n", cm_delay)
 
-# Get the list of encoded column names by dropping the target variables and non-encoded columns from the dataframe's columns
-encoded_column_names = X_delay.columns
+# Get the list of encoded column names from the feature builder
+encoded_column_names = encoder.feature_names_
 
 # Get the feature importances from the trained model for predicting project delays
 importances_delay = model_delay.feature_importances_
@@ -82,7 +82,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 
-# Assuming you have the 'df', 'feature_importances_delay', and 'feature_importances_need' DataFrames from the previous analysis
+from model_artifacts import load_metrics
+
+# 'df' and the delay model come from the analysis above; the need-for-infrastructure model is
+# read from the artifacts written by train_models.py
 
 # Create the Dash app
 app = dash.Dash(__name__)
@@ -164,9 +167,8 @@ def update_confusion_matrix_delay(_):
     Input('confusion-matrix-need', 'id')
 )
 def update_confusion_matrix_need(_):
-    # Assuming you have 'cm_need' from your analysis
     fig = go.Figure(data=go.Heatmap(
-        z=cm_need,
+        z=load_metrics('need')['confusion_matrix'],
         x=['No Need', 'Need'],
         y=['No Need', 'Need'],
         colorscale='Greens'
@@ -184,7 +186,7 @@ def update_feature_importance_plot(selected_model):
     if selected_model == 'delay':
         data = feature_importances_delay.head(10)  # Show top 10 features
     else:
-        data = feature_importances_need.head(10)
+        data = load_metrics('need')['feature_importances'].head(10)
 
     fig = px.bar(data, x='importance', y='feature', orientation='h',
                  title=f'Feature Importance - {selected_model.capitalize()} Prediction',
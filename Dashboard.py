@@ -1,26 +1,87 @@
-import pandas as pd
+from collections import namedtuple
+
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 
+from binned_histogram import BinnedHistogram
+from bitmap_index import CategoryBitmapIndex
+from chart_aggregates import aggregate_completion, density_image, scatter_render_mode
+from data_provider import DataProvider
+from figure_cache import FigureCache
+from filter_cache import FilterCache
+from shared_dataset import load_shared, share_snapshot
+from summary_cube import SummaryCube
+from treemap_nodes import TreemapNodes
+
+# Completion chart aggregation: 'mean' or 'median' per bar, and how many settlements
+# keep their own bars (None shows all settlements, the rest are pooled into 'Other')
+COMPLETION_STAT = 'mean'
+COMPLETION_TOP_N = None
+
+# Population/growth scatter: WebGL markers from this many rows, a server-side density
+# image (SCATTER_RASTER_BINS bins per numeric axis) from the higher threshold
+SCATTER_WEBGL_THRESHOLD = 10_000
+SCATTER_RASTER_THRESHOLD = 500_000
+SCATTER_RASTER_BINS = 200
 
 # Load dataset
-df = pd.read_csv('DATA/infrastructure_deliverables.csv')
+DATA_PATH = 'DATA/infrastructure_deliverables.csv'
+
+# Everything the callbacks read, published together as one immutable snapshot
+Snapshot = namedtuple('Snapshot', ['df', 'filter_cache', 'summary_cube', 'budget_histogram', 'treemap_nodes'])
+
+
+def build_snapshot(df, previous, removed, added):
+    """Build the aggregates for a new dataset snapshot, adjusting only the affected cells when possible"""
+    cube = histogram = nodes = None
+    if previous is not None:
+        cube = previous.summary_cube.updated(removed, added)
+        histogram = previous.budget_histogram.updated(cube, removed, added) if cube is not None else None
+        nodes = previous.treemap_nodes.updated(removed, added)
+
+    # Filtered subsets shared by all filter callbacks, one entry per distinct selection
+    index = CategoryBitmapIndex(df)
+    if cube is None or histogram is None:
+        # Per (Project Type, Project Status) sums and counts for the KPI cards
+        cube = SummaryCube(df, index=index)
+        # Budget histogram counts per cube cell over 50 fixed bins
+        histogram = BinnedHistogram(df, 'Project Budget (KES)', cube, nbins=50)
+    if nodes is None:
+        # Project Type -> Project Status -> Settlement Name budget rollup for the treemap
+        nodes = TreemapNodes(df, path=['Project Type', 'Project Status', 'Settlement Name'],
+                             values='Project Budget (KES)')
+
+    return Snapshot(df, FilterCache(df, maxsize=32, index=index), cube, histogram, nodes)
+
+
+# Memory-mapped read-only columns, so gunicorn workers share one copy via the page cache.
+# A background thread picks up changes to the CSV and records ingested later (ingest.py);
+# each upserted snapshot is mapped again from a shared copy instead of kept per worker.
+provider = DataProvider(DATA_PATH, build_snapshot, loader=load_shared, share=share_snapshot).start()
+
+# Serialized chart figures per (callback, filter selection), dropped whenever the dataset changes
+figure_cache = FigureCache(version_func=lambda: provider.version, max_bytes=64 * 1024 * 1024)
 
 # Create a Dash application
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+server = app.server  # WSGI entry point, e.g. gunicorn -w 4 Dashboard:server
 
-# Helper function for calculating descriptive statistics
-def calculate_statistics(filtered_df):
-    total_budget = filtered_df['Project Budget (KES)'].sum()
-    avg_completion = filtered_df['Completion Percentage'].mean()
-    project_count = filtered_df.shape[0]
-    avg_population_density = filtered_df['Population Density'].mean()
-    avg_growth_rate = filtered_df['Growth Rate'].mean()
+# Helper function for calculating descriptive statistics from the pre-aggregated cube
+def calculate_statistics(selected_project_types, selected_statuses):
+    summary_cube = provider.snapshot.summary_cube
+    summary = summary_cube.summarize(selected_project_types, selected_statuses)
+    total_budget = summary['sum'].get('Project Budget (KES)', float('nan'))
+    avg_completion = summary['mean'].get('Completion Percentage', float('nan'))
+    project_count = summary['count']
+    avg_population_density = summary['mean'].get('Population Density', float('nan'))
+    avg_growth_rate = summary['mean'].get('Growth Rate', float('nan'))
 
-    status_counts = filtered_df['Project Status'].value_counts()
+    status_counts = summary_cube.col_counts(selected_project_types, selected_statuses)
 
     return {
         'total_budget': total_budget,
@@ -102,7 +163,7 @@ app.layout = dbc.Container([
             html.Label("Select Project Type:"),
             dcc.Dropdown(
                 id="project_type_filter",
-                options=[{'label': ptype, 'value': ptype} for ptype in df['Project Type'].unique()],
+                options=[],  # Filled from the current snapshot by update_filter_options
                 multi=True,
                 placeholder="Filter by Project Type",
                 style={'color': '#000'}
@@ -113,7 +174,7 @@ app.layout = dbc.Container([
             html.Label("Select Project Status:"),
             dcc.Dropdown(
                 id="project_status_filter",
-                options=[{'label': status, 'value': status} for status in df['Project Status'].unique()],
+                options=[],  # Filled from the current snapshot by update_filter_options
                 multi=True,
                 placeholder="Filter by Project Status",
                 style={'color': '#000'}
@@ -134,6 +195,19 @@ app.layout = dbc.Container([
 ], fluid=True, style={'padding': '20px'})
 
 
+# Callback filling the filter dropdowns from the current snapshot on every page load, so
+# categories that arrive with reloaded or ingested data can be selected
+@app.callback(
+    [Output('project_type_filter', 'options'),
+     Output('project_status_filter', 'options')],
+    Input('project_type_filter', 'id')  # This input is just to trigger the callback on page load
+)
+def update_filter_options(_):
+    df = provider.snapshot.df
+    return ([{'label': ptype, 'value': ptype} for ptype in df['Project Type'].dropna().unique()],
+            [{'label': status, 'value': status} for status in df['Project Status'].dropna().unique()])
+
+
 # Callback for updating descriptive statistics
 @app.callback(
     [Output('total_budget', 'children'),
@@ -146,15 +220,8 @@ app.layout = dbc.Container([
      Input('project_status_filter', 'value')]
 )
 def update_statistics(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    # Apply filters if any
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
-
-    stats = calculate_statistics(filtered_df)
+    # KPI cards are answered from the summary cube, without touching the rows
+    stats = calculate_statistics(selected_project_types, selected_statuses)
 
     # Format outputs for better readability
     total_budget = f"{stats['total_budget']:,.2f} KES"
@@ -173,23 +240,22 @@ def update_statistics(selected_project_types, selected_statuses):
     [Input('project_type_filter', 'value'),
      Input('project_status_filter', 'value')]
 )
+@figure_cache.cached('update_completion_chart')
 def update_completion_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
+    filtered_df = provider.snapshot.filter_cache.get(selected_project_types, selected_statuses)
 
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
+    # One bar per (Project Type, Settlement) instead of one per project row
+    completion_df = aggregate_completion(filtered_df, stat=COMPLETION_STAT, top_n=COMPLETION_TOP_N)
 
     fig = px.bar(
-        filtered_df,
+        completion_df,
         x='Project Type',
         y='Completion Percentage',
         color='Settlement Name',
         barmode='group',
         title="Completion Percentage by Project Type and Settlement",
-        hover_data=['Settlement Name'],
-        labels={'Completion Percentage': 'Completion Percentage (%)'}
+        hover_data=['Settlement Name', 'Mean Completion', 'Median Completion', 'Projects'],
+        labels={'Completion Percentage': f'{COMPLETION_STAT.capitalize()} Completion Percentage (%)'}
     )
 
     fig.update_layout(
@@ -212,16 +278,11 @@ def update_completion_chart(selected_project_types, selected_statuses):
     [Input('project_type_filter', 'value'),
      Input('project_status_filter', 'value')]
 )
+@figure_cache.cached('update_budget_chart')
 def update_budget_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
-
-    fig = px.histogram(filtered_df, x='Project Budget (KES)', nbins=50,
-                       title="Project Budget Distribution")
+    # Bin counts come from the pre-binned histogram, so the payload is 50 bars for any row count
+    fig = provider.snapshot.budget_histogram.figure(selected_project_types, selected_statuses,
+                                                    title="Project Budget Distribution")
 
     fig.update_layout(
         xaxis_title="Project Budget (KES)",
@@ -241,24 +302,36 @@ def update_budget_chart(selected_project_types, selected_statuses):
     [Input('project_type_filter', 'value'),
      Input('project_status_filter', 'value')]
 )
+@figure_cache.cached('update_population_growth_chart')
 def update_population_growth_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
-
-    fig = px.scatter(
-        filtered_df,
-        x='Population Density',
-        y='Growth Rate',
-        color='Project Type',
-        size='Project Budget (KES)',
-        hover_name='Settlement Name',
-        title="Population Density vs Growth Rate by Settlement",
-        labels={'Population Density': 'Population Density (People per Sq Km)', 'Growth Rate': 'Annual Growth Rate (%)'}
-    )
+    filtered_df = provider.snapshot.filter_cache.get(selected_project_types, selected_statuses)
+    render_mode = scatter_render_mode(len(filtered_df), SCATTER_WEBGL_THRESHOLD, SCATTER_RASTER_THRESHOLD)
+    title = "Population Density vs Growth Rate by Settlement"
+    mode_label = {'svg': 'SVG', 'webgl': 'WebGL', 'raster': 'density image'}[render_mode]
+
+    if render_mode == 'raster':
+        # Too many points to ship: rasterize server-side and send the count image
+        counts, x_centers, y_centers = density_image(filtered_df, 'Population Density', 'Growth Rate',
+                                                     bins=SCATTER_RASTER_BINS)
+        fig = go.Figure(go.Heatmap(
+            x=x_centers, y=y_centers, z=np.where(counts > 0, counts, np.nan),
+            colorscale='Viridis', colorbar=dict(title="Projects"),
+            hovertemplate="Density: %{x}<br>Growth: %{y}<br>Projects: %{z}<extra></extra>"
+        ))
+    else:
+        fig = px.scatter(
+            filtered_df,
+            x='Population Density',
+            y='Growth Rate',
+            color='Project Type',
+            size='Project Budget (KES)',
+            hover_name='Settlement Name',
+            render_mode=render_mode,
+            labels={'Population Density': 'Population Density (People per Sq Km)', 'Growth Rate': 'Annual Growth Rate (%)'}
+        )
+
+    # Report the rendering mode under the chart title
+    fig.update_layout(title=f"{title}<br><sup>{len(filtered_df):,} projects, rendered as {mode_label}</sup>")
 
     fig.update_layout(
         coloraxis_colorbar=dict(title="Project Type"),
@@ -280,19 +353,11 @@ def update_population_growth_chart(selected_project_types, selected_statuses):
     [Input('project_type_filter', 'value'),
      Input('project_status_filter', 'value')]
 )
+@figure_cache.cached('update_hierarchy_chart')
 def update_hierarchy_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
-
-    fig = px.treemap(
-        filtered_df, path=['Project Type', 'Project Status', 'Settlement Name'],
-        values='Project Budget (KES)',
-        title="Project Type, Status, and Settlement Hierarchy"
-    )
+    # Nodes come from the precomputed rollup, masked for the current filters
+    fig = provider.snapshot.treemap_nodes.figure(selected_project_types, selected_statuses,
+                                                 title="Project Type, Status, and Settlement Hierarchy")
 
     fig.update_layout(
         plot_bgcolor="#f9f9f9",
@@ -1,17 +1,46 @@
-import pandas as pd
+from collections import namedtuple
+
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
 import plotly.express as px
+import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 
-# Load dataset
-df = pd.read_csv('DATA/infrastructure_deliverables.csv')
+from bitmap_index import CategoryBitmapIndex
+from data_provider import DataProvider
+from data_store import load_dataset
+from filter_cache import FilterCache
+from model_artifacts import load_metrics
+from summary_cube import SummaryCube
+
+# Everything the callbacks read, published together as one immutable snapshot
+Snapshot = namedtuple('Snapshot', ['df', 'filter_cache', 'summary_cube'])
+
+
+def build_snapshot(df, previous, removed, added):
+    """Build the filter cache and KPI cube for a new dataset snapshot"""
+    # Filtered subsets backed by the bitmap index, shared by all filter callbacks
+    index = CategoryBitmapIndex(df)
+    # Per (Project Type, Project Status) sums and counts for the KPI cards, adjusted in place of
+    # a rebuild when only known cells change
+    cube = previous.summary_cube.updated(removed, added) if previous is not None else None
+    if cube is None:
+        cube = SummaryCube(df, index=index)
+    return Snapshot(df, FilterCache(df, maxsize=32, index=index), cube)
 
-# Helper function for calculating descriptive statistics
-def calculate_statistics(filtered_df):
-    # Handle cases where the dataset may be empty or contain NaN values
-    if filtered_df.empty:
+
+# Load dataset; a background thread picks up changes to the CSV and records ingested later (ingest.py)
+provider = DataProvider('DATA/infrastructure_deliverables.csv', build_snapshot, loader=load_dataset).start()
+
+# Helper function for calculating descriptive statistics from the pre-aggregated cube
+def calculate_statistics(selected_project_types, selected_statuses):
+    summary_cube = provider.snapshot.summary_cube
+    # Missing values count as 0, so means are taken over all selected rows
+    summary = summary_cube.summarize(selected_project_types, selected_statuses, fill_na=True)
+
+    # Handle cases where the selection is empty
+    if summary['count'] == 0:
         return {
             'total_budget': 0,
             'avg_completion': 0,
@@ -21,13 +50,13 @@ def calculate_statistics(filtered_df):
             'status_counts': {}
         }
 
-    total_budget = filtered_df['Project Budget (KES)'].fillna(0).sum()
-    avg_completion = filtered_df['Completion Percentage'].fillna(0).mean()
-    project_count = filtered_df.shape[0]
-    avg_population_density = filtered_df['Population Density'].fillna(0).mean()
-    avg_growth_rate = filtered_df['Growth Rate'].fillna(0).mean()
+    total_budget = summary['sum'].get('Project Budget (KES)', float('nan'))
+    avg_completion = summary['mean'].get('Completion Percentage', float('nan'))
+    project_count = summary['count']
+    avg_population_density = summary['mean'].get('Population Density', float('nan'))
+    avg_growth_rate = summary['mean'].get('Growth Rate', float('nan'))
 
-    status_counts = filtered_df['Project Status'].value_counts()
+    status_counts = summary_cube.col_counts(selected_project_types, selected_statuses)
 
     return {
         'total_budget': total_budget,
@@ -112,7 +141,7 @@ app.layout = dbc.Container([
             html.Label("Select Project Type:"),
             dcc.Dropdown(
                 id="project_type_filter",
-                options=[{'label': ptype, 'value': ptype} for ptype in df['Project Type'].unique()],
+                options=[],  # Filled from the current snapshot by update_filter_options
                 multi=True,
                 placeholder="Filter by Project Type",
                 style={'color': '#000'}
@@ -123,7 +152,7 @@ app.layout = dbc.Container([
             html.Label("Select Project Status:"),
             dcc.Dropdown(
                 id="project_status_filter",
-                options=[{'label': status, 'value': status} for status in df['Project Status'].unique()],
+                options=[],  # Filled from the current snapshot by update_filter_options
                 multi=True,
                 placeholder="Filter by Project Status",
                 style={'color': '#000'}
@@ -140,10 +169,46 @@ app.layout = dbc.Container([
     dbc.Row([
         dbc.Col(dcc.Graph(id='population_growth_chart'), width=6),
         dbc.Col(dcc.Graph(id='hierarchy_chart'), width=6)
+    ], className="mb-4"),
+
+    # Model performance, read from the artifacts written by train_models.py
+    dbc.Row([
+        dbc.Col(dcc.Graph(id='confusion_matrix_delay'), width=6),
+        dbc.Col(dcc.Graph(id='confusion_matrix_need'), width=6)
+    ], className="mb-4"),
+
+    dbc.Row([
+        dbc.Col([
+            html.Label("Feature Importance For:"),
+            dcc.Dropdown(
+                id='feature_importance_model',
+                options=[
+                    {'label': 'Project Delay', 'value': 'delay'},
+                    {'label': 'Need for New Infrastructure', 'value': 'need'}
+                ],
+                value='delay',
+                clearable=False,
+                style={'color': '#000'}
+            ),
+            dcc.Graph(id='feature_importance_chart')
+        ], width=12)
     ])
 ], fluid=True, style={'padding': '20px'})
 
 
+# Callback filling the filter dropdowns from the current snapshot on every page load, so
+# categories that arrive with reloaded or ingested data can be selected
+@app.callback(
+    [Output('project_type_filter', 'options'),
+     Output('project_status_filter', 'options')],
+    Input('project_type_filter', 'id')  # This input is just to trigger the callback on page load
+)
+def update_filter_options(_):
+    df = provider.snapshot.df
+    return ([{'label': ptype, 'value': ptype} for ptype in df['Project Type'].dropna().unique()],
+            [{'label': status, 'value': status} for status in df['Project Status'].dropna().unique()])
+
+
 # Callback for updating descriptive statistics
 @app.callback(
     [Output('total_budget', 'children'),
@@ -156,16 +221,8 @@ app.layout = dbc.Container([
      Input('project_status_filter', 'value')]
 )
 def update_statistics(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    # Apply filters if any
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
-
-    # Calculate stats, handling potential empty dataset
-    stats = calculate_statistics(filtered_df)
+    # Calculate stats from the summary cube, handling potential empty selections
+    stats = calculate_statistics(selected_project_types, selected_statuses)
 
     # Format outputs for better readability
     total_budget = f"{stats['total_budget']:,.2f} KES"
@@ -185,12 +242,7 @@ def update_statistics(selected_project_types, selected_statuses):
      Input('project_status_filter', 'value')]
 )
 def update_completion_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
+    filtered_df = provider.snapshot.filter_cache.get(selected_project_types, selected_statuses)
 
     fig = px.bar(
         filtered_df,
@@ -224,12 +276,7 @@ def update_completion_chart(selected_project_types, selected_statuses):
      Input('project_status_filter', 'value')]
 )
 def update_budget_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
+    filtered_df = provider.snapshot.filter_cache.get(selected_project_types, selected_statuses)
 
     fig = px.histogram(filtered_df, x='Project Budget (KES)', nbins=50,
                        title="Project Budget Distribution")
@@ -253,12 +300,7 @@ def update_budget_chart(selected_project_types, selected_statuses):
      Input('project_status_filter', 'value')]
 )
 def update_population_growth_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
+    filtered_df = provider.snapshot.filter_cache.get(selected_project_types, selected_statuses)
 
     fig = px.scatter(
         filtered_df,
@@ -292,12 +334,7 @@ def update_population_growth_chart(selected_project_types, selected_statuses):
      Input('project_status_filter', 'value')]
 )
 def update_hierarchy_chart(selected_project_types, selected_statuses):
-    filtered_df = df.copy()
-
-    if selected_project_types:
-        filtered_df = filtered_df[filtered_df['Project Type'].isin(selected_project_types)]
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['Project Status'].isin(selected_statuses)]
+    filtered_df = provider.snapshot.filter_cache.get(selected_project_types, selected_statuses)
 
     fig = px.treemap(
         filtered_df, path=['Project Type', 'Project Status', 'Settlement Name'],
@@ -315,6 +352,80 @@ def update_hierarchy_chart(selected_project_types, selected_statuses):
     return fig
 
 
+# Placeholder figure for models that have not been trained yet
+def missing_model_figure(title):
+    fig = go.Figure()
+    fig.update_layout(title=f"{title} (no trained model, run train_models.py)", title_x=0.5,
+                      plot_bgcolor="#f9f9f9", paper_bgcolor="#f9f9f9")
+    return fig
+
+
+# Callbacks for the confusion matrices; artifacts are loaded on first use, not at startup
+def confusion_matrix_figure(name, title, colorscale):
+    try:
+        metrics = load_metrics(name)
+    except FileNotFoundError:
+        return missing_model_figure(title)
+
+    fig = go.Figure(data=go.Heatmap(
+        z=metrics['confusion_matrix'],
+        x=metrics['labels'],
+        y=metrics['labels'],
+        colorscale=colorscale
+    ))
+    fig.update_layout(
+        title=f"{title} (accuracy {metrics['accuracy']:.2%})",
+        xaxis_title="Predicted",
+        yaxis_title="Actual",
+        plot_bgcolor="#f9f9f9",
+        paper_bgcolor="#f9f9f9",
+        title_font=dict(size=20, color='rgb(34, 34, 34)'),
+        title_x=0.5
+    )
+    return fig
+
+
+@app.callback(
+    Output('confusion_matrix_delay', 'figure'),
+    Input('confusion_matrix_delay', 'id')  # Only triggers the callback on initial load
+)
+def update_confusion_matrix_delay(_):
+    return confusion_matrix_figure('delay', "Confusion Matrix - Project Delay Prediction", 'Blues')
+
+
+@app.callback(
+    Output('confusion_matrix_need', 'figure'),
+    Input('confusion_matrix_need', 'id')
+)
+def update_confusion_matrix_need(_):
+    return confusion_matrix_figure('need', "Confusion Matrix - Need for New Infrastructure Prediction", 'Greens')
+
+
+# Callback for updating the Feature Importance chart
+@app.callback(
+    Output('feature_importance_chart', 'figure'),
+    Input('feature_importance_model', 'value')
+)
+def update_feature_importance_chart(selected_model):
+    title = f"Feature Importance - {'Project Delay' if selected_model == 'delay' else 'Need for New Infrastructure'}"
+    try:
+        metrics = load_metrics(selected_model)
+    except FileNotFoundError:
+        return missing_model_figure(title)
+
+    # Show the top 10 features
+    fig = px.bar(metrics['feature_importances'].head(10), x='importance', y='feature', orientation='h',
+                 title=title, labels={'importance': 'Importance', 'feature': 'Feature'})
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},  # Sort bars by importance
+        plot_bgcolor="#f9f9f9",
+        paper_bgcolor="#f9f9f9",
+        title_font=dict(size=20, color='rgb(34, 34, 34)'),
+        title_x=0.5
+    )
+    return fig
+
+
 # Run the app
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
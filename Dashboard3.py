@@ -1,114 +1,102 @@
+import functools
+
 import dash
 from dash import dcc, html
+from dash.dependencies import Input, Output
 
 
+import numpy as np
 import plotly.graph_objs as go
-import pandas as pd
+
+from correlation import load_correlation, top_pairs
+from data_store import load_dataset
 
 # Load your dataset
-df_settlement_data = pd.read_csv('DATA/settlement_data.csv')
+DATA_PATH = 'DATA/settlement_data.csv'
+df_settlement_data = load_dataset(DATA_PATH)
 
-# Assuming you have your dataset loaded in a DataFrame called 'df_settlement_data'
+EDUCATION_COLUMNS = ['Primary Education No of People', 'Secondary Education No of People',
+                     'Higher Education No of People']
 
-# Compute the correlation matrix for numerical columns
-numerical_cols = df_settlement_data.select_dtypes(include=['number']).columns
-correlation_matrix = df_settlement_data[numerical_cols].corr()
+CHART_STYLE = dict(plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
+ROW_STYLE = {'display': 'flex', 'justifyContent': 'space-around', 'margin': '20px'}
 
-# Filter for high correlations (absolute value >= 0.9)
-high_correlations = correlation_matrix[((correlation_matrix >= 0.9) | (correlation_matrix <= -0.9)) & (correlation_matrix != 1.00)]
 
-# Select two highly correlated fields or fallback to the two most correlated pairs
-if not high_correlations.empty:
-    correlated_fields = high_correlations.unstack().sample(2).index.tolist()
-else:
-    # Get the two pairs with the highest correlation (excluding self-correlations of 1.0)
-    top_correlations = correlation_matrix.unstack().sort_values(ascending=False)
-    top_correlations = top_correlations[top_correlations != 1.0]
-    correlated_fields = top_correlations[:2].index.tolist()
+# Aggregates behind the figures. Nothing is computed at import: each aggregate is built the
+# first time a tab needs it and then shared by every figure and request in the process.
+@functools.lru_cache(maxsize=None)
+def correlated_fields():
+    """The two most strongly correlated pairs by |r|, excluding self-correlations.
 
-field1, field2 = correlated_fields[0]
-field3, field4 = correlated_fields[1]
+    The choice is deterministic, so every worker shows the same charts. The correlation
+    matrix is computed once per version of the data file.
+    """
+    correlation_matrix = load_correlation(DATA_PATH, method='pearson', df=df_settlement_data)
+    return top_pairs(correlation_matrix, k=2)
 
-# Create the Dash app
-app = dash.Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'])
 
-# Prepare data for the grouped bar chart
-education_data = df_settlement_data[['Settlement CODE', 'Primary Education No of People', 'Secondary Education No of People', 'Higher Education No of People']]
-education_data_melted = pd.melt(education_data, id_vars=['Settlement CODE'], var_name='Education Level', value_name='Number of People')
+@functools.lru_cache(maxsize=None)
+def value_counts(column):
+    return df_settlement_data[column].value_counts()
 
-# Define the layout with styling
-app.layout = html.Div([
-    html.H1("Settlement Data Dashboard", style={'textAlign': 'center', 'color': '#333'}),
 
-    # Numerical histograms
-    html.Div([
-        dcc.Graph(
-            id='field1-histogram',
-            figure={
-                'data': [go.Histogram(x=df_settlement_data[field1], nbinsx=20, marker_color='#1f77b4')],
-                'layout': go.Layout(title=f'Histogram of {field1}', xaxis_title=field1, yaxis_title='Frequency',
-                                    plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
-            }
-        ),
-        dcc.Graph(
-            id='field2-histogram',
-            figure={
-                'data': [go.Histogram(x=df_settlement_data[field2], nbinsx=20, marker_color='#ff7f0e')],
-                'layout': go.Layout(title=f'Histogram of {field2}', xaxis_title=field2, yaxis_title='Frequency',
-                                    plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
-            }
-        ),
-        dcc.Graph(
-            id='household-size-histogram',
-            figure={
-                'data': [go.Histogram(x=df_settlement_data['Avg Household Size'], nbinsx=20, marker_color='#2ca02c')],
-                'layout': go.Layout(title='Average Household Size', xaxis_title='Household Size', yaxis_title='Frequency',
-                                    plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
-            }
-        ),
-    ], style={'display': 'flex', 'justifyContent': 'space-around', 'margin': '20px'}),
+@functools.lru_cache(maxsize=None)
+def histogram(column, nbins=20):
+    """Bin counts and edges, so the figure ships `nbins` bars instead of every row"""
+    values = df_settlement_data[column].to_numpy(dtype=float)
+    return np.histogram(values[~np.isnan(values)], bins=nbins)
+
+
+def histogram_figure(column, title, xaxis_title, color):
+    counts, edges = histogram(column)
+    return {
+        'data': [go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color=color)],
+        'layout': go.Layout(title=title, xaxis_title=xaxis_title, yaxis_title='Frequency', bargap=0, **CHART_STYLE)
+    }
+
+
+def value_counts_figure(column, title, marker_color=None):
+    counts = value_counts(column)
+    return {
+        'data': [go.Bar(x=counts.index, y=counts.to_numpy(), marker_color=marker_color)],
+        'layout': go.Layout(title=title, xaxis_title=column, yaxis_title='Count', **CHART_STYLE)
+    }
+
+
+def render_distributions():
+    (field1, field2, _), _ = correlated_fields()
+    return html.Div([
+        dcc.Graph(id='field1-histogram',
+                  figure=histogram_figure(field1, f'Histogram of {field1}', field1, '#1f77b4')),
+        dcc.Graph(id='field2-histogram',
+                  figure=histogram_figure(field2, f'Histogram of {field2}', field2, '#ff7f0e')),
+        dcc.Graph(id='household-size-histogram',
+                  figure=histogram_figure('Avg Household Size', 'Average Household Size', 'Household Size',
+                                          '#2ca02c')),
+    ], style=ROW_STYLE)
+
+
+def render_categories():
+    return html.Div([
+        dcc.Graph(id='income-level-bar',
+                  figure=value_counts_figure('Income Level', 'Income Level Distribution',
+                                             ['#1f77b4', '#ff7f0e', '#2ca02c'])),
+        dcc.Graph(id='agriculture-type-bar',
+                  figure=value_counts_figure('Agriculture Type', 'Agriculture Type Distribution')),
+        dcc.Graph(id='water-source-bar',
+                  figure=value_counts_figure('Water Source', 'Water Source Distribution')),
+    ], style=ROW_STYLE)
 
-    # Categorical bar charts
-    html.Div([
-        dcc.Graph(
-            id='income-level-bar',
-            figure={
-                'data': [go.Bar(x=df_settlement_data['Income Level'].value_counts().index,
-                                y=df_settlement_data['Income Level'].value_counts(),
-                                marker_color=['#1f77b4', '#ff7f0e', '#2ca02c'])],
-                'layout': go.Layout(title='Income Level Distribution', xaxis_title='Income Level', yaxis_title='Count',
-                                    plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
-            }
-        ),
-        dcc.Graph(
-            id='agriculture-type-bar',
-            figure={
-                'data': [go.Bar(x=df_settlement_data['Agriculture Type'].value_counts().index,
-                                y=df_settlement_data['Agriculture Type'].value_counts())],
-                'layout': go.Layout(title='Agriculture Type Distribution', xaxis_title='Agriculture Type',
-                                    yaxis_title='Count', plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
-            }
-        ),
-        dcc.Graph(
-            id='water-source-bar',
-            figure={
-                'data': [go.Bar(x=df_settlement_data['Water Source'].value_counts().index,
-                                y=df_settlement_data['Water Source'].value_counts())],
-                'layout': go.Layout(title='Water Source Distribution', xaxis_title='Water Source', yaxis_title='Count',
-                                    plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
-            }
-        ),
-    ], style={'display': 'flex', 'justifyContent': 'space-around', 'margin': '20px'}),
 
-    # Additional plots
-    html.Div([
+def render_population_education():
+    return html.Div([
         dcc.Graph(
             id='population-income-scatter',
             figure={
                 'data': [go.Scatter(x=df_settlement_data['Population'], y=df_settlement_data['Income Level'],
                                     mode='markers', marker_color='#d62728')],
                 'layout': go.Layout(title='Population vs Income Level', xaxis_title='Population',
-                                    yaxis_title='Income Level', plot_bgcolor='#f5f5f5', paper_bgcolor='#fff')
+                                    yaxis_title='Income Level', **CHART_STYLE)
             }
         ),
         # Grouped bar chart for Education Levels by Settlement
@@ -117,28 +105,56 @@ app.layout = html.Div([
             figure={
                 'data': [
                     go.Bar(
-                        x=education_data_melted[education_data_melted['Education Level'] == level]['Settlement CODE'],
-                        y=education_data_melted[education_data_melted['Education Level'] == level]['Number of People'],
+                        x=df_settlement_data['Settlement CODE'],
+                        y=df_settlement_data[level],
                         name=level.replace(' No of People', ''),
                         marker=dict(color=color)
-                    ) for level, color in zip(
-                        education_data_melted['Education Level'].unique(),
-                        ['#1f77b4', '#ff7f0e', '#2ca02c']
-                    )
+                    ) for level, color in zip(EDUCATION_COLUMNS, ['#1f77b4', '#ff7f0e', '#2ca02c'])
                 ],
                 'layout': go.Layout(
                     title='Education Levels by Settlement',
                     xaxis_title='Settlement CODE',
                     yaxis_title='Number of People',
                     barmode='group',
-                    plot_bgcolor='#f5f5f5',
-                    paper_bgcolor='#fff'
+                    **CHART_STYLE
                 )
             }
         )
-    ], style={'display': 'flex', 'justifyContent': 'space-around', 'margin': '20px'}),
+    ], style=ROW_STYLE)
+
+
+# Tab value -> function building that tab's graphs
+TABS = {
+    'distributions': render_distributions,
+    'categories': render_categories,
+    'population-education': render_population_education
+}
+
+# Create the Dash app
+app = dash.Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'])
+
+# Define the layout with styling; the graphs of a tab are only built once it is opened
+app.layout = html.Div([
+    html.H1("Settlement Data Dashboard", style={'textAlign': 'center', 'color': '#333'}),
+
+    dcc.Tabs(id='settlement-tabs', value='distributions', children=[
+        dcc.Tab(label='Numerical Distributions', value='distributions'),
+        dcc.Tab(label='Categorical Distributions', value='categories'),
+        dcc.Tab(label='Population and Education', value='population-education'),
+    ]),
+    dcc.Loading(html.Div(id='settlement-tab-content'))
 ])
 
+
+# Callback rendering the selected tab
+@app.callback(
+    Output('settlement-tab-content', 'children'),
+    Input('settlement-tabs', 'value')
+)
+def render_tab(tab):
+    return TABS[tab]()
+
+
 # Run the app with external stylesheet
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app.run_server(debug=True)
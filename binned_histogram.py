@@ -0,0 +1,73 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+# Histogram with fixed bin edges, pre-binned per (Project Type, Project Status) cell of a
+# SummaryCube. A filtered histogram is the sum of the selected cells' counts, so the figure
+# carries `nbins` bars whatever the number of rows.
+class BinnedHistogram:
+    def __init__(self, df, column, cube, nbins=50):
+        self.column = column
+        self.cube = cube
+        values = df[column].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+
+        if present.any():
+            low, high = values[present].min(), values[present].max()
+        else:
+            low, high = 0.0, 1.0
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        self.edges = np.linspace(low, high, nbins + 1)
+
+        # Same bin assignment as np.histogram: half-open bins, the last one closed
+        bins = np.clip(np.searchsorted(self.edges, values[present], side='right') - 1, 0, nbins - 1)
+        ids = cube.cell_ids[present] * nbins + bins
+        size = cube.shape[0] * cube.shape[1] * nbins
+        self.counts = np.bincount(ids, minlength=size).reshape(*cube.shape, nbins)
+
+    def updated(self, cube, removed, added):
+        """Return a copy with `removed` rows taken out and `added` rows put in, counted in `cube`'s cells.
+
+        Returns None when a row falls outside the bin edges or outside the cube's cells, in
+        which case the histogram has to be rebuilt.
+        """
+        histogram = copy.copy(self)
+        histogram.cube = cube
+        histogram.counts = self.counts.copy()
+        nbins = len(self.edges) - 1
+
+        for rows, sign in [(removed, -1), (added, 1)]:
+            if rows is None or len(rows) == 0:
+                continue
+            cell_ids = cube.row_cells(rows)
+            if cell_ids is None:
+                return None
+            values = pd.to_numeric(rows[self.column]).to_numpy(dtype=float)
+            present = ~np.isnan(values)
+            values = values[present]
+            if ((values < self.edges[0]) | (values > self.edges[-1])).any():
+                return None
+            bins = np.clip(np.searchsorted(self.edges, values, side='right') - 1, 0, nbins - 1)
+            ids = cell_ids[present] * nbins + bins
+            histogram.counts += sign * np.bincount(ids, minlength=self.counts.size).reshape(self.counts.shape)
+        return histogram
+
+    def histogram(self, selected_rows, selected_cols):
+        """Return (counts, edges) for the selection"""
+        return self.counts[self.cube.cells(selected_rows, selected_cols)].sum(axis=(0, 1)), self.edges
+
+    def figure(self, selected_rows, selected_cols, title=None):
+        counts, edges = self.histogram(selected_rows, selected_cols)
+        fig = go.Figure(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            customdata=np.column_stack([edges[:-1], edges[1:]]),
+            hovertemplate="%{customdata[0]:,.0f} - %{customdata[1]:,.0f}<br>Count: %{y}<extra></extra>"
+        ))
+        fig.update_layout(title=title, bargap=0)
+        return fig
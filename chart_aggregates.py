@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+
+# Reduce the completion chart input to one row per (Project Type, Settlement Name).
+# `stat` picks the plotted value ('mean' or 'median'); both and the project count are kept
+# for hover. With `top_n`, only the settlements with the most projects keep their own bars
+# and the rest are pooled into 'Other', so the figure is bounded by category cardinality.
+def aggregate_completion(filtered_df, stat='mean', top_n=None, other_label='Other'):
+    if stat not in ('mean', 'median'):
+        raise ValueError(f"stat must be 'mean' or 'median', got {stat!r}")
+
+    settlements = filtered_df['Settlement Name']
+    if top_n is not None:
+        top_settlements = settlements.value_counts().index[:top_n]
+        settlements = settlements.astype(object).where(settlements.isin(top_settlements), other_label)
+
+    grouped = filtered_df['Completion Percentage'].groupby(
+        [filtered_df['Project Type'], settlements], observed=True, sort=True)
+    aggregated = grouped.agg(['mean', 'median', 'count']).reset_index()
+    aggregated.columns = ['Project Type', 'Settlement Name', 'Mean Completion', 'Median Completion', 'Projects']
+    aggregated['Completion Percentage'] = aggregated[f'{stat.capitalize()} Completion']
+    return aggregated
+
+
+# Pick how to draw a scatter of `n_rows` points: SVG markers, WebGL markers (Scattergl)
+# from `webgl_threshold` rows, or a server-side density image from `raster_threshold` rows
+def scatter_render_mode(n_rows, webgl_threshold, raster_threshold):
+    if n_rows >= raster_threshold:
+        return 'raster'
+    if n_rows >= webgl_threshold:
+        return 'webgl'
+    return 'svg'
+
+
+def _axis_bins(series, bins):
+    # Numeric axes get `bins` equal-width bins, categorical axes one bin per category
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype=float)
+        present = values[~np.isnan(values)]
+        low, high = (present.min(), present.max()) if len(present) else (0.0, 1.0)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, bins + 1)
+        positions = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+        positions[np.isnan(values)] = -1
+        return positions, (edges[:-1] + edges[1:]) / 2
+
+    categorical = pd.Categorical(series)
+    return categorical.codes.astype(np.int64), list(categorical.categories)
+
+
+# Rasterize a scatter into a 2D count image, so the payload size is bounded by the
+# image resolution rather than by the number of points
+def density_image(filtered_df, x, y, bins=200):
+    x_positions, x_centers = _axis_bins(filtered_df[x], bins)
+    y_positions, y_centers = _axis_bins(filtered_df[y], bins)
+    present = (x_positions >= 0) & (y_positions >= 0)
+
+    ids = y_positions[present] * len(x_centers) + x_positions[present]
+    counts = np.bincount(ids, minlength=len(x_centers) * len(y_centers))
+    return counts.reshape(len(y_centers), len(x_centers)), x_centers, y_centers
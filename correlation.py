@@ -0,0 +1,118 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_store import SOURCE_KEY, load_dataset, pa, pq, source_signature
+from streaming_stats import StreamingStats
+
+METHODS = ('pearson', 'spearman')
+
+
+def pearson(df, chunk_size=None):
+    """Pearson correlation matrix of the numeric columns, using pairwise-complete rows like DataFrame.corr().
+
+    With `chunk_size`, the co-moments are accumulated over row chunks, so the float copy of
+    the data never exceeds one chunk.
+    """
+    numeric = df.select_dtypes(include=['number'])
+    stats = StreamingStats(numeric.columns)
+    chunk_size = chunk_size or max(len(numeric), 1)
+    for start in range(0, len(numeric), chunk_size):
+        stats.update(numeric.iloc[start:start + chunk_size])
+    return stats.correlation()
+
+
+def spearman(df, chunk_size=None):
+    """Spearman rank correlation: Pearson on average ranks, matching DataFrame.corr(method='spearman').
+
+    Complete columns are ranked once and streamed like `pearson`. As in pandas, every pair
+    involving a column with missing values is re-ranked over the rows where both are present.
+    """
+    numeric = df.select_dtypes(include=['number'])
+    matrix = pearson(numeric.rank(method='average'), chunk_size=chunk_size)
+    missing = numeric.isna().to_numpy()
+    partial = np.flatnonzero(missing.any(axis=0))
+    if len(partial) == 0:
+        return matrix
+
+    values = numeric.to_numpy(dtype=float)
+    result = matrix.to_numpy(copy=True)
+    for i in partial:
+        for j in range(len(numeric.columns)):
+            if j == i or (missing[:, j].any() and j < i):
+                continue  # Diagonal, or a pair of partial columns already done from the other side
+            both = ~(missing[:, i] | missing[:, j])
+            r = np.nan
+            if both.sum() > 1:
+                x = pd.Series(values[both, i]).rank(method='average').to_numpy()
+                y = pd.Series(values[both, j]).rank(method='average').to_numpy()
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    r = np.corrcoef(x, y)[0, 1]
+            result[i, j] = result[j, i] = r
+    return pd.DataFrame(result, index=matrix.index, columns=matrix.columns)
+
+
+def correlation_matrix(df, method='pearson', chunk_size=None):
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    return (pearson if method == 'pearson' else spearman)(df, chunk_size=chunk_size)
+
+
+def top_pairs(matrix, k=2, threshold=None):
+    """The k most strongly correlated column pairs, as (column, column, r) sorted by |r|.
+
+    Each pair appears once (upper triangle, no self-correlations). Ties are broken by column
+    order, so every process picks the same pairs. With `threshold`, only pairs with
+    |r| >= threshold are returned.
+    """
+    values = matrix.to_numpy()
+    rows, cols = np.triu_indices(len(matrix.columns), k=1)
+    strength = np.abs(values[rows, cols])
+    keep = ~np.isnan(strength)
+    if threshold is not None:
+        keep &= strength >= threshold
+    rows, cols, strength = rows[keep], cols[keep], strength[keep]
+    # lexsort sorts by the last key first: |r| descending, then row, then column position
+    order = np.lexsort((cols, rows, -strength))[:k]
+    return [(matrix.columns[rows[i]], matrix.columns[cols[i]], values[rows[i], cols[i]]) for i in order]
+
+
+def correlation_path(csv_path, method='pearson'):
+    return os.path.splitext(csv_path)[0] + f'.{method}-correlation.parquet'
+
+
+def load_correlation(csv_path, method='pearson', df=None, chunk_size=None):
+    """Correlation matrix of a dataset in DATA/, computed once per version of the source file.
+
+    The matrix is stored next to the CSV, tagged with the CSV's signature like the Parquet
+    copy in data_store, so every worker and restart reuses it until the data changes.
+    """
+    path = correlation_path(csv_path, method)
+    signature = source_signature(csv_path)
+    if pq is not None and os.path.exists(path):
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(SOURCE_KEY) == signature:
+            return pd.read_parquet(path)
+
+    matrix = correlation_matrix(df if df is not None else load_dataset(csv_path), method, chunk_size)
+    if pq is not None:
+        table = pa.Table.from_pandas(matrix, preserve_index=True)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_KEY: signature})
+        pq.write_table(table, path + f'.tmp-{os.getpid()}')
+        os.replace(path + f'.tmp-{os.getpid()}', path)
+    return matrix
+
+
+# Print the strongest correlations of a dataset and check the matrix against DataFrame.corr()
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'DATA/settlement_data.csv'
+    df = load_dataset(csv_path)
+    for method in METHODS:
+        matrix = load_correlation(csv_path, method, df=df)
+        reference = df.select_dtypes(include=['number']).corr(method=method)
+        error = np.nanmax(np.abs(matrix.to_numpy() - reference.to_numpy()))
+        print(f"{method}: max |difference| from DataFrame.corr() {error:.2e}")
+        for first, second, r in top_pairs(matrix, k=5):
+            print(f"  {first} ~ {second}: {r:+.3f}")
@@ -0,0 +1,64 @@
+import sys
+import threading
+import traceback
+
+from data_store import load_dataset
+from ingest import POLL_INTERVAL, JournalFollower
+
+
+# Current snapshot of a dataset for a dashboard process, kept fresh by a background thread.
+# The thread watches the source CSV (mtime/size) and its ingestion journal; on a change it
+# loads the data and builds the derived structures off the request path, then publishes the
+# new snapshot with a single reference swap, so a request sees either the old or the new
+# snapshot in full. `build(df, previous, removed, added)` returns the snapshot; previous,
+# removed and added are None for a full load, otherwise the snapshot can be adjusted.
+# `loader` and `share` are passed to the JournalFollower.
+class DataProvider:
+    def __init__(self, csv_path, build, loader=load_dataset, poll_interval=POLL_INTERVAL, share=None):
+        self.csv_path = csv_path
+        self.build = build
+        self.poll_interval = poll_interval
+        # Polling is paced by the watcher thread, so the follower itself is not throttled
+        self._follower = JournalFollower(csv_path, loader=loader, poll_interval=0, share=share)
+        self._snapshot = build(self._follower.df, None, None, None)
+        self.version = 0
+        self._follower.subscribe(self._publish)
+        self._failing = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self):
+        """The current snapshot; read it once per request and use that object throughout"""
+        return self._snapshot
+
+    def _publish(self, df, removed, added):
+        previous = self._snapshot if removed is not None else None
+        self._snapshot = self.build(df, previous, removed, added)
+        # Bump the version after the swap, so whoever sees the new version also sees the new data
+        self.version += 1
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._follower.poll()
+                self._failing = False
+            except Exception:
+                # Keep serving the current snapshot (e.g. the CSV is mid-write) and retry;
+                # report a failure once, not on every retry
+                if not self._failing:
+                    print(f"DataProvider: reloading {self.csv_path} failed, retrying", file=sys.stderr)
+                    traceback.print_exc()
+                self._failing = True
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name=f'DataProvider({self.csv_path})', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet cache disabled, loaders read the CSV directly
+    pa = None
+    pq = None
+
+# Explicit dtypes for the datasets in DATA/, so neither the CSV nor the Parquet path has to
+# infer them. Files without a schema get low-cardinality text columns as categoricals.
+SCHEMAS = {
+    'infrastructure_deliverables.csv': {
+        'categorical': ['Settlement Name', 'Project Type', 'Project Status', 'Infrastructure Level',
+                        'Population Density', 'Growth Rate'],
+        'dates': ['Start Date', 'End Date']
+    },
+    'kenyan_projects_dataset.csv': {
+        'categorical': ['Settlement Name', 'Project Type', 'Project Completion Status', 'Requirement',
+                        'Implementing Partner', 'Type of Settlement'],
+        'dates': ['Start Date', 'End Date']
+    },
+    'kenya_project_dataset.csv': {
+        'categorical': ['Project Type', 'Project Completion Status', 'Implementing Partner',
+                        'Type of Settlement'],
+        'dates': []
+    }
+}
+
+# Key under which the source CSV's (mtime, size) is stored in the Parquet metadata
+SOURCE_KEY = b'source_signature'
+
+
+def columnar_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return f'{stat.st_mtime_ns}:{stat.st_size}'.encode()
+
+
+def read_csv_typed(csv_path, usecols=None):
+    """Read a CSV from DATA/ with its explicit categorical and datetime dtypes"""
+    schema = SCHEMAS.get(os.path.basename(csv_path))
+    if schema is None:
+        df = pd.read_csv(csv_path, usecols=usecols)
+        for column in df.select_dtypes(include=['object', 'string']).columns:
+            if df[column].nunique() < 0.5 * len(df):
+                df[column] = df[column].astype('category')
+        return df
+
+    return pd.read_csv(csv_path, usecols=usecols, **typed_csv_arguments(schema, usecols))
+
+
+def typed_csv_arguments(schema, usecols=None):
+    """read_csv arguments (dtype, parse_dates) for the columns of `schema` that are read"""
+    present = set(usecols) if usecols is not None else None
+    dtypes = {column: 'category' for column in schema['categorical'] if present is None or column in present}
+    dates = [column for column in schema['dates'] if present is None or column in present]
+    return {'dtype': dtypes, 'parse_dates': dates}
+
+
+def is_fresh(csv_path):
+    """True if the Parquet copy exists and was written from the current CSV"""
+    path = columnar_path(csv_path)
+    if pq is None or not os.path.exists(path):
+        return False
+    metadata = pq.read_schema(path).metadata or {}
+    return metadata.get(SOURCE_KEY) == source_signature(csv_path)
+
+
+def convert_to_columnar(csv_path):
+    """Write the typed CSV to Parquet next to it and return the Parquet path"""
+    if pq is None:
+        raise ImportError("pyarrow is required to write Parquet files")
+    signature = source_signature(csv_path)
+    table = pa.Table.from_pandas(read_csv_typed(csv_path), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_KEY: signature})
+
+    # Write to a temporary file first so readers never see a partial Parquet file
+    path = columnar_path(csv_path)
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def load_dataset(csv_path, columns=None):
+    """Load a dataset from its fresh Parquet copy, falling back to the typed CSV"""
+    if is_fresh(csv_path):
+        return pd.read_parquet(columnar_path(csv_path), columns=columns)
+    return read_csv_typed(csv_path, usecols=columns)
+
+
+def read_chunks(path, chunk_size, columns=None):
+    """Stream a CSV or Parquet file as DataFrames of at most `chunk_size` rows"""
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet files")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        # Typed like read_csv_typed, so a chunk with an all-empty date column still parses as dates
+        schema = SCHEMAS.get(os.path.basename(path))
+        arguments = typed_csv_arguments(schema, columns) if schema is not None else {}
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns, **arguments)
+
+
+def load_manifest(manifest_path, columns=None):
+    """Load a dataset written as Parquet parts (e.g. by generators/new_data.py --workers)"""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    directory = os.path.dirname(manifest_path)
+    parts = [pd.read_parquet(os.path.join(directory, part['file']), columns=columns) for part in manifest['parts']]
+    return pd.concat(parts, ignore_index=True)
+
+
+# Convert DATA/*.csv to Parquet, or compare the cold-start cost of both paths with --benchmark
+if __name__ == '__main__':
+    import subprocess
+
+    arguments = [argument for argument in sys.argv[1:] if argument != '--benchmark']
+    csv_paths = arguments or sorted(os.path.join('DATA', name) for name in os.listdir('DATA') if name.endswith('.csv'))
+
+    for csv_path in csv_paths:
+        print(f"{csv_path} -> {convert_to_columnar(csv_path)}")
+
+    if '--benchmark' in sys.argv:
+        # Time each loader in a fresh interpreter, as a new worker would pay it
+        for csv_path in csv_paths:
+            timings = {}
+            for label, loader in [('pd.read_csv', f"pd.read_csv({csv_path!r})"),
+                                  ('typed CSV', f"data_store.read_csv_typed({csv_path!r})"),
+                                  ('Parquet', f"data_store.load_dataset({csv_path!r})")]:
+                code = ("import time, pandas as pd, data_store\n"
+                        f"start = time.perf_counter(); {loader}; print(time.perf_counter() - start)")
+                runs = [float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                             check=True).stdout) for _ in range(5)]
+                timings[label] = min(runs)
+            print(f"{csv_path}: " + ", ".join(f"{label} {seconds * 1e3:.1f} ms" for label, seconds in timings.items()))
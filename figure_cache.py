@@ -0,0 +1,110 @@
+import functools
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_signature(path):
+    """Return (mtime, size) of `path`, used to notice when the source data changes"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Server-side cache of serialized Plotly figures keyed by callback name and filter inputs.
+# Entries are evicted least-recently-used once the stored JSON exceeds `max_bytes`, and the
+# whole cache is dropped when the source file (or a custom version function) changes.
+class FigureCache:
+    def __init__(self, source_path=None, max_bytes=64 * 1024 * 1024, version_func=None):
+        if version_func is None and source_path is not None:
+            version_func = functools.partial(file_signature, source_path)
+        self.version_func = version_func
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._version = version_func() if version_func else None
+        self._payloads = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name, *inputs):
+        """Normalize callback inputs: selection order is ignored and None/[] are equivalent"""
+        normalized = []
+        for value in inputs:
+            if isinstance(value, (list, tuple)):
+                value = tuple(sorted(value)) if value else None
+            normalized.append(value)
+        return (name, *normalized)
+
+    def _check_version(self):
+        if self.version_func is None:
+            return
+        version = self.version_func()
+        if version != self._version:
+            self._payloads.clear()
+            self.size_bytes = 0
+            self._version = version
+
+    def get(self, key):
+        """Return (payload or None, data version the lookup was made at)"""
+        with self._lock:
+            self._check_version()
+            payload = self._payloads.get(key)
+            if payload is None:
+                self.misses += 1
+                return None, self._version
+            self._payloads.move_to_end(key)
+            self.hits += 1
+            return payload, self._version
+
+    def put(self, key, payload, version=None):
+        """Store a payload built at `version` (as returned by get); dropped if the data changed since"""
+        size = len(payload)
+        # A figure bigger than the whole budget is served but never cached
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version()
+            # Built from a snapshot that has been replaced meanwhile: serve it, but never cache it
+            if self.version_func is not None and version != self._version:
+                return
+            if key in self._payloads:
+                self.size_bytes -= len(self._payloads.pop(key))
+            self._payloads[key] = payload
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._payloads.popitem(last=False)
+                self.size_bytes -= len(evicted)
+                self.evictions += 1
+
+    def cached(self, name):
+        """Decorator for figure callbacks: the figure JSON is built once per normalized input"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*inputs):
+                key = self.make_key(name, *inputs)
+                payload, version = self.get(key)
+                if payload is None:
+                    payload = func(*inputs).to_json()
+                    self.put(key, payload, version)
+                return json.loads(payload)
+            return wrapper
+        return decorator
+
+    def clear(self):
+        with self._lock:
+            self._payloads.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._payloads),
+                'size_bytes': self.size_bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+
+from bitmap_index import CategoryBitmapIndex
+
+
+# Bounded LRU cache of filtered frames, shared by every callback that filters
+# on (Project Type, Project Status). Each distinct selection is computed once,
+# using the precomputed bitmap index rather than string comparisons.
+class FilterCache:
+    def __init__(self, df, maxsize=32, index=None):
+        self.df = df
+        self.index = index if index is not None else CategoryBitmapIndex(df)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(selected_project_types, selected_statuses):
+        """Normalize a dropdown selection so that order and None/[] do not matter"""
+        types = tuple(sorted(selected_project_types)) if selected_project_types else None
+        statuses = tuple(sorted(selected_statuses)) if selected_statuses else None
+        return types, statuses
+
+    def _filter(self, types, statuses):
+        return self.index.filter(self.df, {'Project Type': types, 'Project Status': statuses})
+
+    def get(self, selected_project_types, selected_statuses):
+        key = self.make_key(selected_project_types, selected_statuses)
+
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return self._frames[key]
+            self.misses += 1
+
+        # Filter outside the lock so a slow miss does not block cache hits
+        filtered_df = self._filter(*key)
+
+        with self._lock:
+            self._frames[key] = filtered_df
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.maxsize:
+                self._frames.popitem(last=False)
+
+        return filtered_df
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._frames),
+                'maxsize': self.maxsize
+            }
@@ -0,0 +1,56 @@
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only CSV output is available
+    pa = None
+    pq = None
+
+
+def write_chunks(chunks, output, total_rows=None, label=None):
+    """Append DataFrame chunks to a CSV file or to Parquet row groups, reporting throughput per chunk.
+
+    Only one chunk is held in memory at a time, so peak memory does not grow with the row count.
+    """
+    parquet = output.endswith('.parquet')
+    if parquet and pq is None:
+        raise ImportError("pyarrow is required to write Parquet files")
+
+    writer = None
+    f = None if parquet else open(output, 'w', newline='')
+    rows_written = 0
+    started = last = time.perf_counter()
+    try:
+        # Chunks are generated lazily, so each interval covers generating and writing a chunk
+        for i, chunk in enumerate(chunks):
+            if parquet:
+                if writer is None:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(output, table.schema)
+                else:
+                    # Later chunks follow the first chunk's schema, e.g. when a column is all null
+                    table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(f, header=(i == 0), index=False)
+            rows_written += len(chunk)
+
+            now = time.perf_counter()
+            progress = f"{rows_written:,}/{total_rows:,}" if total_rows else f"{rows_written:,}"
+            print(f"{label + ' ' if label else ''}chunk {i + 1}: {progress} rows | "
+                  f"{len(chunk) / (now - last):,.0f} rows/s | "
+                  f"{rows_written / (now - started):,.0f} rows/s overall")
+            last = now
+    finally:
+        if writer is not None:
+            writer.close()
+        if f is not None:
+            f.close()
+    return rows_written
+
+
+def chunk_sizes(rows, chunk_size):
+    """Split `rows` into consecutive chunk lengths of at most `chunk_size`"""
+    for start in range(0, rows, chunk_size):
+        yield min(chunk_size, rows - start)
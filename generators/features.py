@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Feature columns of the infrastructure deliverables dataset
+CATEGORICAL_FEATURES = ['Settlement Name', 'Project Type', 'Project Status', 'Infrastructure Level',
+                        'Population Density', 'Growth Rate']
+NUMERIC_FEATURES = ['Completion Percentage', 'Project Budget (KES)']
+
+
+# Feature matrix builder shared by the classifiers. Categorical columns are never expanded
+# into dense dummies: they become either a one-hot CSR block built straight from category
+# codes, or native pandas categoricals for estimators that split on them (XGBoost).
+# Categories unseen at fit time get no one-hot entry, like OneHotEncoder(handle_unknown='ignore').
+class FeatureBuilder:
+    def __init__(self, categorical=CATEGORICAL_FEATURES, numeric=NUMERIC_FEATURES, scale_numeric=True):
+        self.categorical = list(categorical)
+        self.numeric = list(numeric)
+        self.scale_numeric = scale_numeric
+
+    def fit(self, df):
+        self.categories_ = {column: list(pd.Categorical(df[column]).categories) for column in self.categorical}
+        numeric = df[self.numeric].to_numpy(dtype=float)
+        self.mean_ = numeric.mean(axis=0) if self.scale_numeric else np.zeros(len(self.numeric))
+        scale = numeric.std(axis=0) if self.scale_numeric else np.ones(len(self.numeric))
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+        self.feature_names_ = self.numeric + [
+            f'{column}_{category}' for column in self.categorical for category in self.categories_[column]
+        ]
+        return self
+
+    def _numeric(self, df):
+        return (df[self.numeric].to_numpy(dtype=float) - self.mean_) / self.scale_
+
+    def _codes(self, df, column):
+        return pd.Categorical(df[column], categories=self.categories_[column]).codes
+
+    def transform_sparse(self, df):
+        """Numeric columns followed by the one-hot blocks, as a float32 CSR matrix.
+
+        Random forests fit faster on dense input: densify this final float32 matrix with
+        .toarray() rather than building dense dummies column by column.
+        """
+        n_rows = len(df)
+        rows, cols, values = [], [], []
+
+        numeric = self._numeric(df)
+        for position in range(len(self.numeric)):
+            rows.append(np.arange(n_rows))
+            cols.append(np.full(n_rows, position))
+            values.append(numeric[:, position])
+
+        offset = len(self.numeric)
+        for column in self.categorical:
+            codes = self._codes(df, column)
+            known = codes >= 0
+            rows.append(np.flatnonzero(known))
+            cols.append(offset + codes[known])
+            values.append(np.ones(known.sum()))
+            offset += len(self.categories_[column])
+
+        return sp.csr_matrix(
+            (np.concatenate(values).astype(np.float32), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_rows, offset)
+        )
+
+    def transform_codes(self, df):
+        """Numeric columns plus one pandas categorical per categorical column, for native-categorical estimators"""
+        features = pd.DataFrame(self._numeric(df), columns=self.numeric, index=df.index)
+        for column in self.categorical:
+            features[column] = pd.Categorical(df[column], categories=self.categories_[column])
+        return features
+
+    def fit_transform_sparse(self, df):
+        return self.fit(df).transform_sparse(df)
+
+
+# Benchmark: memory and fit time of dense get_dummies features against the sparse/native paths
+if __name__ == '__main__':
+    import sys
+    import time
+
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from xgboost import XGBClassifier
+
+    from infrastructure_data import generate_infrastructure_deliverables
+
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = generate_infrastructure_deliverables(n_records, seed=42)
+    y = df['Need New Infrastructure'].to_numpy()
+
+    started = time.perf_counter()
+    dense = pd.get_dummies(df[NUMERIC_FEATURES + CATEGORICAL_FEATURES], columns=CATEGORICAL_FEATURES, dtype=float)
+    dense[NUMERIC_FEATURES] = (dense[NUMERIC_FEATURES] - dense[NUMERIC_FEATURES].mean()) / dense[NUMERIC_FEATURES].std(ddof=0)
+    dense = dense.to_numpy()
+    dense_build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    builder = FeatureBuilder().fit(df)
+    sparse = builder.transform_sparse(df)
+    sparse_build = time.perf_counter() - started
+    codes = builder.transform_codes(df)
+
+    sparse_bytes = sparse.data.nbytes + sparse.indices.nbytes + sparse.indptr.nbytes
+    print(f"{n_records:,} records, {sparse.shape[1]} features")
+    print(f"  dense  matrix: {dense.nbytes / 2 ** 20:8.1f} MiB, built in {dense_build:.2f} s")
+    print(f"  sparse matrix: {sparse_bytes / 2 ** 20:8.1f} MiB, built in {sparse_build:.2f} s")
+    print(f"  native codes : {codes.memory_usage(deep=True).sum() / 2 ** 20:8.1f} MiB")
+
+    def fit_time(model, X):
+        started = time.perf_counter()
+        model.fit(X, y)
+        return time.perf_counter() - started
+
+    runs = [
+        ('LogisticRegression', lambda: LogisticRegression(max_iter=1000), sparse, 'sparse'),
+        ('XGBClassifier', lambda: XGBClassifier(tree_method='hist', eval_metric='logloss'), sparse, 'sparse'),
+        ('XGBClassifier', lambda: XGBClassifier(tree_method='hist', eval_metric='logloss',
+                                                enable_categorical=True), codes, 'native categorical'),
+        ('RandomForestClassifier', lambda: RandomForestClassifier(n_estimators=50, random_state=42), sparse, 'sparse'),
+    ]
+    for name, make_model, X, label in runs:
+        print(f"  {name:<22} fit dense {fit_time(make_model(), dense):6.2f} s | {label} {fit_time(make_model(), X):6.2f} s")
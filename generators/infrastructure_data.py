@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+# List of Kenyan settlements
+kenyan_settlements = [
+    'Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret', 'Thika', 
+    'Malindi', 'Kitale', 'Garissa', 'Nyeri', 'Machakos', 'Isiolo', 
+    'Naivasha', 'Kericho', 'Lamu', 'Narok', 'Kakamega', 'Embu', 
+    'Meru', 'Marsabit', 'Lodwar', 'Voi', 'Mandera', 'Wajir'
+]
+
+# Define possible project types
+project_types = ['Road', 'School', 'Hospital', 'Water', 'Electricity', 'Bridge', 'Market']
+
+# Define project statuses
+project_statuses = ['Not Started', 'In Progress', 'Completed', 'Delayed']
+
+# Define existing infrastructure levels
+infrastructure_levels = ['Low', 'Medium', 'High']
+
+# Define additional detailed features
+population_density_levels = ['Low', 'Medium', 'High']  # Settlement population density
+settlement_growth_rates = ['Slow', 'Stable', 'Rapid']  # Rate of population or economic growth
+
+columns = [
+    'Settlement Name', 
+    'Project Type', 
+    'Project Status', 
+    'Completion Percentage', 
+    'Start Date', 
+    'End Date', 
+    'Project Budget (KES)', 
+    'Infrastructure Level', 
+    'Population Density', 
+    'Growth Rate', 
+    'Need New Infrastructure'
+]
+
+
+def random_dates(rng, start, end, size):
+    """Generate `size` random dates between `start` and `end` (both inclusive) as datetime64[D]"""
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    return start + rng.integers(0, (end - start).astype(int) + 1, size).astype('timedelta64[D]')
+
+
+def _categorical(rng, categories, size):
+    return pd.Categorical.from_codes(rng.integers(0, len(categories), size), categories)
+
+
+def generate_infrastructure_deliverables(n_records=5000, seed=None):
+    """Generate the infrastructure deliverables dataset as a DataFrame, one column at a time"""
+    rng = np.random.default_rng(seed)
+
+    settlement = _categorical(rng, kenyan_settlements, n_records)
+    project_type = _categorical(rng, project_types, n_records)
+    status = rng.integers(0, len(project_statuses), n_records)
+    not_started = status == project_statuses.index('Not Started')
+    completed = status == project_statuses.index('Completed')
+
+    # Not started: 0% and no dates; completed: 100% and started 2018-2021; otherwise 1-99%, started 2021-2022
+    completion_percentage = np.where(not_started, 0, np.where(completed, 100, rng.integers(1, 100, n_records)))
+    start_date = np.where(completed,
+                          random_dates(rng, '2018-01-01', '2021-01-01', n_records),
+                          random_dates(rng, '2021-01-01', '2022-12-31', n_records))
+    duration = np.where(completed, rng.integers(100, 501, n_records), rng.integers(30, 701, n_records))
+    end_date = start_date + duration.astype('timedelta64[D]')
+    start_date[not_started] = np.datetime64('NaT')
+    end_date[not_started] = np.datetime64('NaT')
+
+    # Random project budget between 1 million and 100 million Kenyan Shillings
+    project_budget = rng.integers(1, 101, n_records) * 1_000_000
+
+    # Random existing infrastructure level and settlement features
+    infrastructure_level = _categorical(rng, infrastructure_levels, n_records)
+    population_density = _categorical(rng, population_density_levels, n_records)
+    growth_rate = _categorical(rng, settlement_growth_rates, n_records)
+
+    # Label: Whether the area needs a new infrastructure project or not (1 = Yes, 0 = No)
+    need_new_infrastructure = (
+        (infrastructure_level == 'Low') &
+        (population_density == 'High') &
+        (growth_rate == 'Rapid') &
+        (completion_percentage < 50)
+    ).astype(int)
+
+    return pd.DataFrame({
+        'Settlement Name': settlement,
+        'Project Type': project_type,
+        'Project Status': pd.Categorical.from_codes(status, project_statuses),
+        'Completion Percentage': completion_percentage,
+        'Start Date': start_date,
+        'End Date': end_date,
+        'Project Budget (KES)': project_budget,
+        'Infrastructure Level': infrastructure_level,
+        'Population Density': population_density,
+        'Growth Rate': growth_rate,
+        'Need New Infrastructure': need_new_infrastructure
+    }, columns=columns)
@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from threadpoolctl import threadpool_limits
+
+
+def _fit_and_score(name, model, X_train, y_train, X_test, y_test, threads):
+    # Cap every thread pool the model can use: its own n_jobs / n_jobs-like parameter and
+    # the BLAS/OpenMP pools underneath, so concurrent models do not oversubscribe the cores
+    params = model.get_params()
+    for param in ('n_jobs', 'nthread'):
+        if param in params:
+            model.set_params(**{param: threads})
+
+    with threadpool_limits(limits=threads):
+        started = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        y_pred = model.predict(X_test)
+        predict_s = time.perf_counter() - started
+
+    # Each worker process runs a single model, so its peak RSS belongs to that model (ru_maxrss is in KiB)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'model': name,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'fit_s': fit_s,
+        'predict_s': predict_s,
+        'peak_rss_mb': peak_rss_mb,
+        'threads': threads
+    }, y_pred
+
+
+def compare_models(candidates, y_train, y_test, n_workers=None, threads_per_model=None):
+    """Train candidate models concurrently, one fresh process per model.
+
+    `candidates` is a list of (name, estimator, X_train, X_test), so each model gets the
+    feature representation it handles best. Returns the results table and the test-set
+    predictions per model.
+    """
+    cpus = os.cpu_count() or 1
+    n_workers = n_workers or min(len(candidates), cpus)
+    threads = threads_per_model or max(1, cpus // n_workers)
+
+    # Spawned single-task workers start clean, so per-model peak memory is not inherited
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, max_tasks_per_child=1) as pool:
+        futures = [
+            pool.submit(_fit_and_score, name, model, X_train, y_train, X_test, y_test, threads)
+            for name, model, X_train, X_test in candidates
+        ]
+        outcomes = [future.result() for future in futures]
+
+    results = pd.DataFrame([result for result, _ in outcomes])
+    predictions = {result['model']: y_pred for result, y_pred in outcomes}
+    return results, predictions
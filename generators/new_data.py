@@ -1,7 +1,13 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+
+from chunked_writer import chunk_sizes, write_chunks
 
 # 1. Kenyan Settlement Names
 settlement_names = [
@@ -25,78 +31,261 @@ implementing_partners = [
     "ActionAid", "AMREF", "World Vision"  # Add more as needed
 ]
 
-# 4. Data Generation
-np.random.seed(42)
+# Project Completion Status model: six states whose weights depend on population
+statuses = ["Completed On Time", "Completed Behind Schedule", "Stalled", "Cancelled", "Ongoing", "Delayed"]
+
+
+def status_completion_probability(population):
+    # Rises from 0.35 to 0.75 over the 1,000-100,000 population range, which leaves about 65% of
+    # projects unfinished overall; capped below 1 like project_data_gen_new.py so the
+    # unfinished states never lose all their weight
+    return np.clip(0.35 + 0.000004 * population, 0, 0.95)
+
+
+def status_probabilities(completion_probability):
+    """Status weights for a completion probability (scalar or per row), normalized to sum to 1"""
+    weights = np.array([0.2 * completion_probability, 0.1 * completion_probability, 0.2 * (1 - completion_probability),
+                        0.1 * (1 - completion_probability), 0.3 * (1 - completion_probability),
+                        0.1 * (1 - completion_probability)])
+    return weights / weights.sum(axis=0)
+
+
+columns = [
+    "Settlement Name", "Project Type", "Project Completion Status", "Completion Percentage",
+    "Start Date", "End Date", "Project Budget (KES)", "Requirement", "Population",
+    "Implementing Partner", "Type of Settlement"
+]
+
+
+# Settlement classes, looked up per row by settlement index: 0 = rural/semi-rural,
+# 1 = semi-urban, 2 = urban. Budget per head is drawn from the class's range.
+urban_settlements = ["Nairobi", "Mombasa", "Kisumu"]
+semi_urban_settlements = ["Thika", "Kitale", "Malindi", "Naivasha"]
+settlement_class = np.array([
+    2 if name in urban_settlements else 1 if name in semi_urban_settlements else 0 for name in settlement_names
+], dtype=np.int8)
+budget_per_head_low = np.array([2, 5, 10])
+budget_per_head_high = np.array([10, 15, 20])
+
+COMPLETED_ON_TIME, COMPLETED_BEHIND_SCHEDULE, STALLED, CANCELLED, ONGOING, DELAYED = range(len(statuses))
+
 
-data = []
-for _ in range(5000):
-    settlement = np.random.choice(settlement_names)
-    project_type = np.random.choice(project_types)
-    implementing_partner = np.random.choice(implementing_partners)
+# 4. Data Generation: the whole model, including the status draw, runs on arrays
+def generate_chunk(rng, rows):
+    settlement = rng.integers(0, len(settlement_names), rows)
+    project_type = rng.integers(0, len(project_types), rows)
+    implementing_partner = rng.integers(0, len(implementing_partners), rows)
+    settlement_cls = settlement_class[settlement]
 
     # Population (correlated with Project Budget)
-    population = np.random.randint(1000, 100000)
+    population = rng.integers(1000, 100000, rows)
 
     # Project Budget (correlated with Population and Settlement Type)
-    if settlement in ["Nairobi", "Mombasa", "Kisumu"]:  # Urban
-        project_budget = population * np.random.uniform(10, 20)
-    elif settlement in ["Thika", "Kitale", "Malindi", "Naivasha"]:  # Semi-Urban
-        project_budget = population * np.random.uniform(5, 15)
-    else:  # Rural/Semi-Rural
-        project_budget = population * np.random.uniform(2, 10)
+    project_budget = population * rng.uniform(budget_per_head_low[settlement_cls], budget_per_head_high[settlement_cls])
 
     # Start Date
-    start_date = datetime(2018, 1, 1) + timedelta(days=np.random.randint(0, 365 * 4))
-
-    # Project Completion Status (65% unfinished, correlated with Population)
-    completion_probability = max(0, 0.35 + 0.00005 * population)  # Ensure probability is non-negative
-    project_completion_status = np.random.choice(
-        ["Completed On Time", "Completed Behind Schedule", "Stalled", "Cancelled", "Ongoing", "Delayed"],
-        p=[0.2 * completion_probability, 0.1 * completion_probability, 0.2 * (1 - completion_probability),
-           0.1 * (1 - completion_probability), 0.3 * (1 - completion_probability), 0.1 * (1 - completion_probability)]
-    )
+    start_date = np.datetime64('2018-01-01') + rng.integers(0, 365 * 4, rows).astype('timedelta64[D]')
+
+    # Project Completion Status: inverse-CDF sampling over each row's cumulative status probabilities
+    cumulative = np.cumsum(status_probabilities(status_completion_probability(population)), axis=0)
+    status = np.minimum((rng.random(rows) >= cumulative).sum(axis=0), len(statuses) - 1)
+    completed = status <= COMPLETED_BEHIND_SCHEDULE
 
     # Completion Percentage & End Date (depends on Project Completion Status)
-    if project_completion_status in ["Completed On Time", "Completed Behind Schedule"]:
-        completion_percentage = 100
-        end_date = start_date + timedelta(days=np.random.randint(30, 365))
-        if project_completion_status == "Completed Behind Schedule":
-            end_date += timedelta(days=np.random.randint(1, 180))  # Add some delay
-    elif project_completion_status == "Delayed":
-        completion_percentage = np.random.randint(50, 90)
-        end_date = pd.NaT
-    else:  # Stalled, Cancelled, Ongoing
-        completion_percentage = np.random.randint(10, 50) if project_completion_status == "Ongoing" else 0
-        end_date = pd.NaT
-
-    # Random Correlation between Project Completion Status and Implementing Partner
-    # (No specific logic, just random assignment)
-
-    # Settlement Type
-    if settlement in ["Nairobi", "Mombasa", "Kisumu"]:
-        settlement_type = "Urban"
-    elif settlement in ["Thika", "Kitale", "Malindi", "Naivasha"]:
-        settlement_type = "Semi-Urban"
-    else:
-        settlement_type = np.random.choice(["Rural", "Semi-Rural"])
+    completion_percentage = np.select(
+        [completed, status == DELAYED, status == ONGOING],
+        [100, rng.integers(50, 90, rows), rng.integers(10, 50, rows)],
+        default=0  # Stalled, Cancelled
+    )
+    duration = rng.integers(30, 365, rows)
+    delay = np.where(status == COMPLETED_BEHIND_SCHEDULE, rng.integers(1, 180, rows), 0)  # Add some delay
+    end_date = np.where(completed, start_date + (duration + delay).astype('timedelta64[D]'), np.datetime64('NaT'))
 
-    # Requirement (Placeholder)
-    requirement = "N/A"
+    # Settlement Type: urban and semi-urban follow the settlement, the rest is Rural or Semi-Rural
+    settlement_type = np.where(settlement_cls == 2, 0, np.where(settlement_cls == 1, 1, rng.integers(2, 4, rows)))
 
-    data.append([
-        settlement, project_type, project_completion_status, completion_percentage,
-        start_date, end_date, project_budget, requirement, population, implementing_partner,
-        settlement_type
-    ])
+    return pd.DataFrame({
+        "Settlement Name": pd.Categorical.from_codes(settlement, settlement_names),
+        "Project Type": pd.Categorical.from_codes(project_type, project_types),
+        "Project Completion Status": pd.Categorical.from_codes(status, statuses),
+        "Completion Percentage": completion_percentage,
+        "Start Date": start_date,
+        "End Date": end_date,
+        "Project Budget (KES)": project_budget,
+        # Requirement (Placeholder)
+        "Requirement": "N/A",
+        "Population": population,
+        "Implementing Partner": pd.Categorical.from_codes(implementing_partner, implementing_partners),
+        "Type of Settlement": pd.Categorical.from_codes(settlement_type,
+                                                        ["Urban", "Semi-Urban", "Rural", "Semi-Rural"])
+    }, columns=columns)
 
-# Create DataFrame
-df = pd.DataFrame(data, columns=[
-    "Settlement Name", "Project Type", "Project Completion Status", "Completion Percentage",
-    "Start Date", "End Date", "Project Budget (KES)", "Requirement", "Population",
-    "Implementing Partner", "Type of Settlement"
-])
 
-# Save to CSV
-df.to_csv("kenyan_projects_dataset_updated.csv", index=False)
+# Reference per-row implementation of the same model, used by --check
+def generate_chunk_loop(rng, rows):
+    data = []
+    for _ in range(rows):
+        settlement = rng.choice(settlement_names)
+        project_type = rng.choice(project_types)
+        implementing_partner = rng.choice(implementing_partners)
+
+        # Population (correlated with Project Budget)
+        population = rng.integers(1000, 100000)
+
+        # Project Budget (correlated with Population and Settlement Type)
+        if settlement in ["Nairobi", "Mombasa", "Kisumu"]:  # Urban
+            project_budget = population * rng.uniform(10, 20)
+        elif settlement in ["Thika", "Kitale", "Malindi", "Naivasha"]:  # Semi-Urban
+            project_budget = population * rng.uniform(5, 15)
+        else:  # Rural/Semi-Rural
+            project_budget = population * rng.uniform(2, 10)
+
+        # Start Date
+        start_date = datetime(2018, 1, 1) + timedelta(days=int(rng.integers(0, 365 * 4)))
+
+        # Project Completion Status (65% unfinished, correlated with Population)
+        completion_probability = status_completion_probability(population)
+        project_completion_status = rng.choice(statuses, p=status_probabilities(completion_probability))
+
+        # Completion Percentage & End Date (depends on Project Completion Status)
+        if project_completion_status in ["Completed On Time", "Completed Behind Schedule"]:
+            completion_percentage = 100
+            end_date = start_date + timedelta(days=int(rng.integers(30, 365)))
+            if project_completion_status == "Completed Behind Schedule":
+                end_date += timedelta(days=int(rng.integers(1, 180)))  # Add some delay
+        elif project_completion_status == "Delayed":
+            completion_percentage = rng.integers(50, 90)
+            end_date = pd.NaT
+        else:  # Stalled, Cancelled, Ongoing
+            completion_percentage = rng.integers(10, 50) if project_completion_status == "Ongoing" else 0
+            end_date = pd.NaT
+
+        # Random Correlation between Project Completion Status and Implementing Partner
+        # (No specific logic, just random assignment)
+
+        # Settlement Type
+        if settlement in ["Nairobi", "Mombasa", "Kisumu"]:
+            settlement_type = "Urban"
+        elif settlement in ["Thika", "Kitale", "Malindi", "Naivasha"]:
+            settlement_type = "Semi-Urban"
+        else:
+            settlement_type = rng.choice(["Rural", "Semi-Rural"])
+
+        # Requirement (Placeholder)
+        requirement = "N/A"
+
+        data.append([
+            settlement, project_type, project_completion_status, completion_percentage,
+            start_date, end_date, project_budget, requirement, population, implementing_partner,
+            settlement_type
+        ])
+
+    return pd.DataFrame(data, columns=columns)
+
+
+def generate_chunks(rows, chunk_size, seed=42):
+    """Yield the register as DataFrames of at most `chunk_size` rows, drawn from one generator"""
+    rng = np.random.default_rng(seed)
+    for size in chunk_sizes(rows, chunk_size):
+        yield generate_chunk(rng, size)
+
+
+def _generate_shard(shard, rows, seed_sequence, chunk_size, output_dir):
+    path = os.path.join(output_dir, f'part-{shard:05d}.parquet')
+    chunks = generate_chunks(rows, chunk_size, seed=seed_sequence)
+    write_chunks(chunks, path, total_rows=rows, label=f'part {shard}')
+    return os.path.basename(path)
+
+
+def generate_parallel(rows, workers, output_dir, chunk_size=1_000_000, seed=42):
+    """Generate `rows` projects as one Parquet part per worker plus a manifest.json.
+
+    Each shard draws from its own SeedSequence child, so the parts are identical for a given
+    (seed, workers) pair however the processes are scheduled.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    shard_rows = [rows // workers + (1 if shard < rows % workers else 0) for shard in range(workers)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(workers)
+    # With fewer rows than workers some shards are empty; they write no part, so skip them
+    shards = [shard for shard in range(workers) if shard_rows[shard] > 0]
+    shard_rows = [shard_rows[shard] for shard in shards]
+
+    with ProcessPoolExecutor(max_workers=max(len(shards), 1)) as pool:
+        files = list(pool.map(_generate_shard, shards, shard_rows, [seed_sequences[shard] for shard in shards],
+                              [chunk_size] * len(shards), [output_dir] * len(shards)))
+
+    manifest = {
+        'rows': rows,
+        'seed': seed,
+        'workers': workers,
+        'columns': columns,
+        'parts': [{'file': file, 'rows': shard_row_count} for file, shard_row_count in zip(files, shard_rows)]
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return os.path.join(output_dir, 'manifest.json')
+
+
+def check_against_loop(rows=50_000, seed=0, alpha=0.001):
+    """Compare the vectorized model with the per-row loop using chi-square and KS tests"""
+    from scipy import stats
+
+    vectorized = generate_chunk(np.random.default_rng(seed), rows)
+    loop = generate_chunk_loop(np.random.default_rng(seed + 1), rows)
+
+    def delay_days(df):
+        return (pd.to_datetime(df['End Date']) - pd.to_datetime(df['Start Date'])).dt.days.dropna()
+
+    results = []
+    for column in ["Project Completion Status", "Type of Settlement", "Settlement Name"]:
+        table = pd.crosstab(pd.concat([vectorized[column].astype(str), loop[column].astype(str)]),
+                            np.repeat(['vectorized', 'loop'], rows))
+        results.append((f"chi-square {column}", stats.chi2_contingency(table).pvalue))
+    for status in statuses:
+        a = vectorized.loc[vectorized["Project Completion Status"] == status]
+        b = loop.loc[loop["Project Completion Status"] == status]
+        if len(a) and len(b) and a["Completion Percentage"].nunique() + b["Completion Percentage"].nunique() > 2:
+            results.append((f"KS completion % | {status}",
+                            stats.ks_2samp(a["Completion Percentage"], b["Completion Percentage"]).pvalue))
+        if status in statuses[:2] and len(a) and len(b):
+            results.append((f"KS end - start days | {status}", stats.ks_2samp(delay_days(a), delay_days(b)).pvalue))
+    for column in ["Population", "Project Budget (KES)"]:
+        results.append((f"KS {column}", stats.ks_2samp(vectorized[column], loop[column]).pvalue))
+
+    passed = True
+    for name, p_value in results:
+        passed &= p_value >= alpha
+        print(f"{'ok  ' if p_value >= alpha else 'FAIL'} p={p_value:.4f}  {name}")
+
+    # Both implementations share the status model, so also check the model against its intended mix
+    unfinished = (~vectorized["Project Completion Status"].isin(statuses[:2])).mean()
+    mix_ok = abs(unfinished - 0.65) <= 0.03
+    passed &= mix_ok
+    print(f"{'ok  ' if mix_ok else 'FAIL'} {unfinished:.1%} unfinished (model targets about 65%)")
+    return passed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic Kenyan projects register with six statuses")
+    parser.add_argument('--rows', type=int, default=5000, help="number of projects to generate")
+    parser.add_argument('--seed', type=int, default=42, help="seed for reproducible output")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="rows generated and written per chunk")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes to generate with; above 1, --output is a directory of Parquet parts")
+    parser.add_argument('--output', default="kenyan_projects_dataset_updated.csv",
+                        help="CSV or .parquet file to write, or the parts directory with --workers")
+    parser.add_argument('--check', action='store_true',
+                        help="only test that the vectorized model matches the per-row loop statistically")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if check_against_loop() else 1)
+    elif args.workers > 1:
+        manifest_path = generate_parallel(args.rows, args.workers, args.output, chunk_size=args.chunk_size,
+                                          seed=args.seed)
+        print(f"Dataset generated in {args.workers} parts, manifest saved to '{manifest_path}'")
+    else:
+        # Generate and save chunk by chunk, so memory stays flat for any --rows
+        write_chunks(generate_chunks(args.rows, args.chunk_size, seed=args.seed), args.output, total_rows=args.rows)
 
-print("Dataset generated and saved to 'kenyan_projects_dataset_updated.csv'")
\ No newline at end of file
+        print(f"Dataset generated and saved to '{args.output}'")
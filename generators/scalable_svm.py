@@ -0,0 +1,50 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.kernel_approximation import Nystroem
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import make_pipeline
+from sklearn.svm import SVC, LinearSVC
+
+# Above this many training samples the exact RBF SVC (quadratic to cubic in samples) is
+# replaced by a Nystroem kernel approximation followed by a linear SVM
+EXACT_SVC_MAX_SAMPLES = 50_000
+
+
+def scale_gamma(X):
+    """The RBF gamma SVC uses with gamma='scale': 1 / (n_features * X.var())"""
+    if sp.issparse(X):
+        mean = X.mean()
+        variance = X.multiply(X).mean() - mean ** 2
+    else:
+        variance = np.asarray(X).var()
+    return 1.0 / (X.shape[1] * variance) if variance > 0 else 1.0
+
+
+def make_svm(X_train, threshold=EXACT_SVC_MAX_SAMPLES, n_components=1000, random_state=42):
+    """Exact RBF SVC for small training sets, Nystroem + LinearSVC above `threshold` samples"""
+    if X_train.shape[0] <= threshold:
+        return SVC(random_state=random_state, kernel='rbf')
+    return make_pipeline(
+        Nystroem(kernel='rbf', gamma=scale_gamma(X_train), n_components=n_components, random_state=random_state),
+        LinearSVC(random_state=random_state)
+    )
+
+
+def svm_accuracy_delta(X_train, y_train, X_test, y_test, reference_size=10_000, n_components=1000,
+                       random_state=42):
+    """Fit the exact and the approximate SVM on the same reference subset and compare test accuracy"""
+    rng = np.random.default_rng(random_state)
+    subset = rng.choice(X_train.shape[0], size=min(reference_size, X_train.shape[0]), replace=False)
+    X_reference, y_reference = X_train[subset], np.asarray(y_train)[subset]
+
+    report = {'reference_size': len(subset)}
+    approximate = make_svm(X_reference, threshold=0, n_components=n_components, random_state=random_state)
+    for label, model in [('exact', SVC(random_state=random_state, kernel='rbf')), ('approximate', approximate)]:
+        started = time.perf_counter()
+        model.fit(X_reference, y_reference)
+        report[f'{label}_fit_s'] = time.perf_counter() - started
+        report[f'{label}_accuracy'] = accuracy_score(y_test, model.predict(X_test))
+    report['accuracy_delta'] = report['approximate_accuracy'] - report['exact_accuracy']
+    return report
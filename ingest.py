@@ -0,0 +1,249 @@
+import argparse
+import fcntl
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import convert_to_columnar, load_dataset, pq, source_signature
+
+# Key of every project record; datasets without it get the row position as their id
+ID_COLUMN = 'Project ID'
+
+# Seconds between two checks of the journal by a JournalFollower
+POLL_INTERVAL = 2.0
+
+
+# Ingestion journal: incoming records are appended as numbered Parquet batches next to the
+# source CSV (DATA/<name>.journal/batch-00000001.parquet, ...). The current dataset is the
+# CSV snapshot with every batch upserted on ID_COLUMN in order; compact() folds the batches
+# back into the CSV. Replaying a batch is idempotent, so a reader racing a compaction is safe.
+def journal_dir(csv_path):
+    return os.path.splitext(csv_path)[0] + '.journal'
+
+
+def journal_batches(csv_path, after=0):
+    """(sequence number, path) of the journal batches newer than `after`, oldest first"""
+    directory = journal_dir(csv_path)
+    if not os.path.isdir(directory):
+        return []
+    batches = []
+    for name in os.listdir(directory):
+        if name.startswith('batch-') and name.endswith('.parquet'):
+            sequence = int(name[len('batch-'):-len('.parquet')])
+            if sequence > after:
+                batches.append((sequence, os.path.join(directory, name)))
+    return sorted(batches)
+
+
+def with_ids(df):
+    """Give a snapshot without ID_COLUMN the row position as project id"""
+    if ID_COLUMN in df.columns:
+        return df
+    df = df.copy(deep=False)
+    df.insert(0, ID_COLUMN, np.arange(len(df), dtype=np.int64))
+    return df
+
+
+def conform(batch, df):
+    """Align an incoming batch with the columns and dtypes of `df`.
+
+    Returns (df, batch): categorical columns of both get the union of their categories, so
+    concatenating them keeps the categorical dtype.
+    """
+    batch = batch.reindex(columns=df.columns)
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            incoming = pd.Index(batch[column].dropna().unique())
+            categories = dtype.categories.append(incoming.difference(dtype.categories))
+            if len(categories) > len(dtype.categories):
+                df = df.assign(**{column: df[column].cat.set_categories(categories)})
+            batch[column] = pd.Categorical(batch[column], categories=categories)
+        elif pd.api.types.is_datetime64_dtype(dtype):
+            batch[column] = pd.to_datetime(batch[column])
+        elif pd.api.types.is_numeric_dtype(dtype):
+            batch[column] = pd.to_numeric(batch[column])
+    return df, batch
+
+
+def upsert(df, batch):
+    """Update the rows of `df` whose id is in `batch` and append the rest of `batch`.
+
+    An update only carries the fields it changes: columns it leaves out or empty keep the
+    stored value of the project. Returns (combined, removed, added): the new snapshot, the
+    rows it no longer holds and the rows that came in, so aggregates can be adjusted
+    instead of rebuilt.
+    """
+    batch = batch.drop_duplicates(ID_COLUMN, keep='last')
+    df, added = conform(batch, df)
+    replaced = df[ID_COLUMN].isin(added[ID_COLUMN]).to_numpy()
+    removed = df[replaced]
+
+    # Merge the incoming fields over the stored rows (new projects have no stored row)
+    stored = removed.set_index(ID_COLUMN).reindex(added[ID_COLUMN].to_numpy())
+    for column in stored.columns:
+        missing = added[column].isna().to_numpy()
+        if missing.any():
+            added.loc[missing, column] = stored[column].to_numpy()[missing]
+            # Keep integer columns integer once every gap is filled
+            if pd.api.types.is_integer_dtype(df[column].dtype) and not added[column].isna().any():
+                added[column] = added[column].astype(df[column].dtype)
+    combined = pd.concat([df[~replaced], added], ignore_index=True)
+    return combined, removed, added
+
+
+def _next_id(csv_path):
+    # Read one column, not the whole snapshot: the ids, or any column to count the rows
+    # that with_ids numbers when the CSV has no ids
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if ID_COLUMN in header:
+        ids = load_dataset(csv_path, columns=[ID_COLUMN])[ID_COLUMN]
+        next_id = int(ids.max()) + 1 if len(ids) else 0
+    else:
+        next_id = len(load_dataset(csv_path, columns=[header[0]]))
+    for _, path in journal_batches(csv_path):
+        batch_ids = pd.read_parquet(path, columns=[ID_COLUMN])[ID_COLUMN]
+        if len(batch_ids):
+            next_id = max(next_id, int(batch_ids.max()) + 1)
+    return next_id
+
+
+def ingest(csv_path, records):
+    """Append new or updated project records to the journal and return the batch's sequence number.
+
+    Records without a project id are new projects and get fresh ids; records with an id
+    update the project they identify; fields they leave out keep their stored value.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required to write journal batches")
+    batch = pd.DataFrame(records).reset_index(drop=True)
+    directory = journal_dir(csv_path)
+    os.makedirs(directory, exist_ok=True)
+
+    # One writer at a time, so sequence numbers and new ids are never handed out twice
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if ID_COLUMN not in batch.columns:
+            batch.insert(0, ID_COLUMN, np.nan)
+        missing = batch[ID_COLUMN].isna().to_numpy()
+        if missing.any():
+            ids = batch[ID_COLUMN].to_numpy(dtype=float, copy=True)
+            ids[missing] = _next_id(csv_path) + np.arange(missing.sum())
+            batch[ID_COLUMN] = ids
+        batch[ID_COLUMN] = batch[ID_COLUMN].astype(np.int64)
+
+        batches = journal_batches(csv_path)
+        sequence = batches[-1][0] + 1 if batches else 1
+        path = os.path.join(directory, f'batch-{sequence:08d}.parquet')
+        # Readers only list finished batches
+        batch.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    return sequence
+
+
+def load_current(csv_path, loader=load_dataset, share=None):
+    """Return (snapshot with every journal batch applied, sequence number of the last batch)
+
+    With `share(csv_path, df, sequence)`, a snapshot with batches applied is swapped for the
+    copy it returns (e.g. shared_dataset.share_snapshot).
+    """
+    df = with_ids(loader(csv_path))
+    sequence = 0
+    for sequence, path in journal_batches(csv_path):
+        df, _, _ = upsert(df, pd.read_parquet(path))
+    if share is not None and sequence:
+        df = share(csv_path, df, sequence)
+    return df, sequence
+
+
+def compact(csv_path):
+    """Fold the journal into the CSV (and its Parquet copy) and drop the applied batches"""
+    directory = journal_dir(csv_path)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        df, sequence = load_current(csv_path)
+        df = df.sort_values(ID_COLUMN, kind='stable')
+        df.to_csv(csv_path + '.tmp', index=False, date_format='%Y-%m-%d')
+        os.replace(csv_path + '.tmp', csv_path)
+        if pq is not None:
+            convert_to_columnar(csv_path)
+        for applied, path in journal_batches(csv_path):
+            if applied <= sequence:
+                os.remove(path)
+    return len(df)
+
+
+# Keeps a process's copy of a dataset current with the journal. poll() is cheap and
+# throttled, so callbacks can call it on every request: new batches are upserted and
+# handed to the subscribers as (df, removed, added), a changed CSV (e.g. after compact())
+# is reloaded and handed over as (df, None, None). `version` goes up on every change.
+# A change is only recorded once every subscriber has taken it, so a load or subscriber
+# failure leaves the follower where it was and the change is retried on the next poll.
+# upsert() builds a private frame, so a follower whose loader maps shared memory
+# (shared_dataset.load_shared) also needs `share` to map each upserted snapshot again.
+class JournalFollower:
+    def __init__(self, csv_path, loader=load_dataset, poll_interval=POLL_INTERVAL, share=None):
+        self.csv_path = csv_path
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self.share = share
+        self.version = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._signature = source_signature(csv_path)
+        self.df, self.sequence = load_current(csv_path, loader, share)
+        self._checked = time.monotonic()
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def _notify(self, df, removed, added):
+        for callback in self._subscribers:
+            callback(df, removed, added)
+        self.version += 1
+
+    def poll(self):
+        """Apply journal changes if the poll interval has passed; returns the current version"""
+        if time.monotonic() - self._checked < self.poll_interval:
+            return self.version
+        # Another request is already applying changes; serve the current data meanwhile
+        if not self._lock.acquire(blocking=False):
+            return self.version
+        try:
+            self._checked = time.monotonic()
+            signature = source_signature(self.csv_path)
+            if signature != self._signature:
+                df, sequence = load_current(self.csv_path, self.loader, self.share)
+                self._notify(df, None, None)
+                self.df, self.sequence, self._signature = df, sequence, signature
+                return self.version
+
+            for sequence, path in journal_batches(self.csv_path, after=self.sequence):
+                df, removed, added = upsert(self.df, pd.read_parquet(path))
+                if self.share is not None:
+                    df = self.share(self.csv_path, df, sequence)
+                self._notify(df, removed, added)
+                self.df, self.sequence = df, sequence
+            return self.version
+        finally:
+            self._lock.release()
+
+
+# Append records from a CSV/Parquet file to a dataset's journal, or fold the journal in with --compact
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Upsert project records into a dataset in DATA/")
+    parser.add_argument('records', nargs='?', help="CSV or Parquet file of new or updated projects")
+    parser.add_argument('--data', default='DATA/infrastructure_deliverables.csv')
+    parser.add_argument('--compact', action='store_true', help="fold the journal back into the CSV")
+    args = parser.parse_args()
+
+    if args.records:
+        records = pd.read_parquet(args.records) if args.records.endswith('.parquet') else pd.read_csv(args.records)
+        sequence = ingest(args.data, records)
+        print(f"{len(records):,} records -> {journal_dir(args.data)} batch {sequence}")
+    if args.compact:
+        print(f"Compacted {args.data}: {compact(args.data):,} projects")
@@ -0,0 +1,62 @@
+import os
+import time
+
+import joblib
+
+# Trained models live here, one directory per model and version:
+#   DATA/models/<name>/<version>/{model,encoder,metrics}.joblib plus DATA/models/<name>/LATEST
+ARTIFACT_DIR = os.path.join('DATA', 'models')
+
+# Loaded artifacts, keyed by (name, version, part)
+_loaded = {}
+
+
+def model_dir(name, version=None):
+    version = version or latest_version(name)
+    return os.path.join(ARTIFACT_DIR, name, version)
+
+
+def latest_version(name):
+    """Version of `name` most recently published by save_artifacts"""
+    with open(os.path.join(ARTIFACT_DIR, name, 'LATEST')) as f:
+        return f.read().strip()
+
+
+def save_artifacts(name, model, encoder, metrics):
+    """Write a new version of a trained model and publish it as LATEST.
+
+    `metrics` holds what the dashboards display (confusion matrix, feature importances, ...).
+    Dumps are uncompressed, so loading skips decompression. (The forest cannot stay
+    memory-mapped: sklearn's trees copy their node arrays into their own buffers when unpickled.)
+    """
+    version = time.strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(ARTIFACT_DIR, name, version)
+    os.makedirs(path, exist_ok=True)
+    joblib.dump(model, os.path.join(path, 'model.joblib'))
+    joblib.dump(encoder, os.path.join(path, 'encoder.joblib'))
+    joblib.dump(metrics, os.path.join(path, 'metrics.joblib'))
+
+    # Switch LATEST only once the whole version is on disk
+    latest = os.path.join(ARTIFACT_DIR, name, 'LATEST')
+    with open(latest + '.tmp', 'w') as f:
+        f.write(version)
+    os.replace(latest + '.tmp', latest)
+    return path
+
+
+def _load(name, part, version=None):
+    version = version or latest_version(name)
+    key = (name, version, part)
+    if key not in _loaded:
+        _loaded[key] = joblib.load(os.path.join(model_dir(name, version), f'{part}.joblib'))
+    return _loaded[key]
+
+
+def load_metrics(name, version=None):
+    """Confusion matrix, feature importances and scores of a trained model, without the model itself"""
+    return _load(name, 'metrics', version)
+
+
+def load_model(name, version=None):
+    """The fitted model and its FeatureBuilder, loaded once per process and version"""
+    return _load(name, 'model', version), _load(name, 'encoder', version)
@@ -1,7 +1,9 @@
+import argparse
+
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+
+from generators.chunked_writer import chunk_sizes, write_chunks
 
 # 1. Kenyan Settlement Names
 settlement_names = [
@@ -25,72 +27,89 @@ implementing_partners = [
     "ActionAid", "AMREF", "World Vision"  # Add more as needed
 ]
 
-# 4. Data Generation
-np.random.seed(42)  # for reproducibility
+# Settlement classes, looked up per row by settlement index: 0 = rural/semi-rural,
+# 1 = semi-urban, 2 = urban. Budget per head is drawn from the class's range.
+urban_settlements = ["Nairobi", "Mombasa", "Kisumu"]
+semi_urban_settlements = ["Thika", "Kitale", "Malindi", "Naivasha"]
+settlement_class = np.array([
+    2 if name in urban_settlements else 1 if name in semi_urban_settlements else 0 for name in settlement_names
+], dtype=np.int8)
+budget_per_head_low = np.array([2, 5, 10])
+budget_per_head_high = np.array([10, 15, 20])
+
+columns = [
+    "Settlement Name", "Project Type", "Project Completion Status", "Completion Percentage",
+    "Start Date", "End Date", "Project Budget (KES)", "Requirement", "Population",
+    "Implementing Partner", "Type of Settlement"
+]
+
+
+# 4. Data Generation: every column is drawn as a whole array from one seeded generator
+def generate_projects(rows, seed=42):
+    return _generate(np.random.default_rng(seed), rows)
 
-data = []
-for _ in range(5000):
-    settlement = np.random.choice(settlement_names)
-    project_type = np.random.choice(project_types)
-    implementing_partner = np.random.choice(implementing_partners)
+
+def generate_chunks(rows, chunk_size, seed=42):
+    """Yield the register as DataFrames of at most `chunk_size` rows, drawn from one generator"""
+    rng = np.random.default_rng(seed)
+    for size in chunk_sizes(rows, chunk_size):
+        yield _generate(rng, size)
+
+
+def _generate(rng, rows):
+    settlement = rng.integers(0, len(settlement_names), rows)
+    project_type = rng.integers(0, len(project_types), rows)
+    implementing_partner = rng.integers(0, len(implementing_partners), rows)
+    settlement_cls = settlement_class[settlement]
 
     # Population (correlated with Project Budget and Project Status)
-    population = np.random.randint(1000, 100000)
+    population = rng.integers(1000, 100000, rows)
 
     # Project Budget (correlated with Population and Settlement Type)
-    if settlement in ["Nairobi", "Mombasa", "Kisumu"]:  # Urban
-        project_budget = population * np.random.uniform(10, 20)
-    elif settlement in ["Thika", "Kitale", "Malindi", "Naivasha"]:  # Semi-Urban
-        project_budget = population * np.random.uniform(5, 15)
-    else:  # Rural/Semi-Rural
-        project_budget = population * np.random.uniform(2, 10)
+    project_budget = population * rng.uniform(budget_per_head_low[settlement_cls], budget_per_head_high[settlement_cls])
 
     # Project Completion Status (correlated with Population)
-    completion_probability = min(0.95, 0.5 + 0.00005 * population)  # Higher population, higher completion chance
-    project_completion_status = np.random.choice(["Completed", "Ongoing"],
-                                                 p=[completion_probability, 1 - completion_probability])
+    completion_probability = np.minimum(0.95, 0.5 + 0.00005 * population)  # Higher population, higher completion chance
+    completed = rng.random(rows) < completion_probability
 
     # Completion Percentage (depends on Project Completion Status)
-    if project_completion_status == "Completed":
-        completion_percentage = 100
-    else:
-        completion_percentage = np.random.randint(10, 90)
-
-        # Start and End Dates
-    start_date = datetime(2018, 1, 1) + timedelta(days=np.random.randint(0, 365 * 4))  # Random date in the last 4 years
-    if project_completion_status == "Completed":
-        end_date = start_date + timedelta(days=np.random.randint(30, 365))  # Completed projects have an end date
-    else:
-        end_date = pd.NaT  # Ongoing projects have no end date
-
-    # Random Correlation between Project Completion Status and Implementing Partner
-    # (No specific logic implemented here, just random assignment)
-
-    # Settlement Type
-    if settlement in ["Nairobi", "Mombasa", "Kisumu"]:
-        settlement_type = "Urban"
-    elif settlement in ["Thika", "Kitale", "Malindi", "Naivasha"]:
-        settlement_type = "Semi-Urban"
-    else:
-        settlement_type = np.random.choice(["Rural", "Semi-Rural"])
-
-    # Requirement (Placeholder, you'll need to define this based on your needs)
-    requirement = "N/A"
-
-    data.append([
-        settlement, project_type, project_completion_status, completion_percentage,
-        start_date, end_date, project_budget, requirement, population, implementing_partner,
-        settlement_type
-    ])
-
-# 5. Create DataFrame
-df = pd.DataFrame(data, columns=[
-    "Settlement Name", "Project Type", "Project Completion Status", "Completion Percentage",
-    "Start Date", "End Date", "Project Budget (KES)", "Requirement", "Population",
-    "Implementing Partner", "Type of Settlement"
-])
-
-# 6. Save to CSV
-df.to_csv("DATA/kenyan_projects_dataset.csv", index=False)
-
-print("Dataset generated and saved to 'kenyan_projects_dataset.csv'")
\ No newline at end of file
+    completion_percentage = np.where(completed, 100, rng.integers(10, 90, rows))
+
+    # Start and End Dates; only completed projects have an end date
+    start_date = np.datetime64('2018-01-01') + rng.integers(0, 365 * 4, rows).astype('timedelta64[D]')
+    end_date = np.where(completed, start_date + rng.integers(30, 365, rows).astype('timedelta64[D]'),
+                        np.datetime64('NaT'))
+
+    # Settlement Type: urban and semi-urban follow the settlement, the rest is Rural or Semi-Rural
+    settlement_type = np.where(settlement_cls == 2, 0, np.where(settlement_cls == 1, 1, rng.integers(2, 4, rows)))
+
+    return pd.DataFrame({
+        "Settlement Name": pd.Categorical.from_codes(settlement, settlement_names),
+        "Project Type": pd.Categorical.from_codes(project_type, project_types),
+        "Project Completion Status": pd.Categorical.from_codes(np.where(completed, 0, 1), ["Completed", "Ongoing"]),
+        "Completion Percentage": completion_percentage,
+        "Start Date": start_date,
+        "End Date": end_date,
+        "Project Budget (KES)": project_budget,
+        # Requirement (Placeholder, you'll need to define this based on your needs)
+        "Requirement": "N/A",
+        "Population": population,
+        "Implementing Partner": pd.Categorical.from_codes(implementing_partner, implementing_partners),
+        "Type of Settlement": pd.Categorical.from_codes(settlement_type,
+                                                        ["Urban", "Semi-Urban", "Rural", "Semi-Rural"])
+    }, columns=columns)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic Kenyan projects register")
+    parser.add_argument('--rows', type=int, default=5000, help="number of projects to generate")
+    parser.add_argument('--seed', type=int, default=42, help="seed for reproducible output")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="rows generated and written per chunk")
+    parser.add_argument('--output', default="DATA/kenyan_projects_dataset.csv",
+                        help="CSV or .parquet file to write")
+    args = parser.parse_args()
+
+    # 5. Generate and 6. save chunk by chunk, so memory stays flat for any --rows
+    write_chunks(generate_chunks(args.rows, args.chunk_size, seed=args.seed), args.output, total_rows=args.rows)
+
+    print(f"Dataset generated and saved to '{args.output}'")
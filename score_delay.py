@@ -0,0 +1,52 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import read_chunks
+from generators.chunked_writer import write_chunks
+from model_artifacts import load_model
+
+PROBABILITY_COLUMN = 'Delay Probability'
+
+
+# Scores projects with the persisted delay model. Rows are always scored in batches: one
+# feature transform and one predict_proba call per batch, never one call per row.
+class DelayScorer:
+    def __init__(self, name='delay', version=None):
+        self.model, self.encoder = load_model(name, version)
+        # Column of predict_proba holding the 'delayed' class
+        self.positive = int(np.flatnonzero(self.model.classes_ == 1)[0])
+
+    def score(self, df):
+        """Delay probability for every row of `df`"""
+        if len(df) == 0:
+            return np.empty(0)
+        X = self.encoder.transform_sparse(df).toarray()
+        return self.model.predict_proba(X)[:, self.positive]
+
+    def score_records(self, records):
+        """Micro-batch entry point: score a list of row dicts (e.g. from a Dash table) in one call"""
+        return self.score(pd.DataFrame.from_records(records))
+
+    def score_chunks(self, chunks):
+        """Yield each chunk with its delay probabilities appended"""
+        for chunk in chunks:
+            yield chunk.assign(**{PROBABILITY_COLUMN: self.score(chunk)})
+
+
+# Score a file of projects in streamed chunks and write the probabilities next to each row
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score projects for delay risk with the trained delay model")
+    parser.add_argument('input', help="CSV or Parquet file of projects")
+    parser.add_argument('output', help="CSV or Parquet file to write, with a 'Delay Probability' column")
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--version', default=None, help="model version (default: latest)")
+    args = parser.parse_args()
+
+    scorer = DelayScorer(version=args.version)
+    started = time.perf_counter()
+    rows = write_chunks(scorer.score_chunks(read_chunks(args.input, args.chunk_size)), args.output, label='scored')
+    elapsed = time.perf_counter() - started
+    print(f"Scored {rows:,} projects in {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s)")
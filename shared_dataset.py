@@ -0,0 +1,154 @@
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_store import load_dataset, source_signature
+
+# Materialized datasets live here, one directory per source version
+SHARED_DIR = os.path.join('DATA', 'shared')
+
+
+def shared_path(csv_path, sequence=0):
+    """Directory holding the memory-mappable copy of `csv_path` with journal batches up to `sequence` applied"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    signature = source_signature(csv_path).decode().replace(':', '-')
+    return os.path.join(SHARED_DIR, f'{stem}-{signature}-{sequence}')
+
+
+def _version(name):
+    """(stem, (source mtime, journal sequence)) of a directory in SHARED_DIR"""
+    stem, mtime, _, sequence = name.rsplit('-', 3)
+    return stem, (int(mtime), int(sequence))
+
+
+def _drop_older(path):
+    # Drop older versions of this dataset; workers still mapping them keep their pages.
+    # Newer ones stay, so a worker that lags behind the journal never removes them.
+    stem, version = _version(os.path.basename(path))
+    for name in os.listdir(SHARED_DIR):
+        if '.tmp-' in name:
+            continue
+        try:
+            other_stem, other_version = _version(name)
+        except ValueError:
+            continue
+        if other_stem == stem and other_version < version:
+            shutil.rmtree(os.path.join(SHARED_DIR, name), ignore_errors=True)
+
+
+def materialize(csv_path, df=None, sequence=0):
+    """Write one .npy file per column (categorical columns as codes) plus a manifest.
+
+    Without `df` the CSV itself is written; otherwise `df` is the dataset with the journal
+    batches up to `sequence` applied (see share_snapshot).
+    """
+    path = shared_path(csv_path, sequence)
+    if os.path.exists(path):
+        _drop_older(path)
+        return path
+
+    if df is None:
+        df = load_dataset(csv_path)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    os.makedirs(tmp_path)
+
+    manifest = {'rows': len(df), 'columns': []}
+    for position, column in enumerate(df.columns):
+        series = df[column]
+        entry = {'name': column, 'file': f'{position:03d}.npy'}
+        if isinstance(series.dtype, pd.CategoricalDtype) or not (
+                pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_dtype(series)):
+            categorical = pd.Categorical(series)
+            entry['categories'] = [str(category) for category in categorical.categories]
+            values = categorical.codes
+        else:
+            values = series.to_numpy()
+        np.save(os.path.join(tmp_path, entry['file']), values)
+        manifest['columns'].append(entry)
+
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+
+    # Publish atomically; if another worker won the race, keep its copy
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return path
+
+    _drop_older(path)
+    return path
+
+
+def _map(path):
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    columns = {}
+    for entry in manifest['columns']:
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if 'categories' in entry:
+            values = pd.Categorical.from_codes(values, categories=entry['categories'])
+        columns[entry['name']] = values
+    # copy=False keeps every column, including the categorical codes, backed by the mapped files
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_shared(csv_path):
+    """Map the materialized dataset read-only; every worker shares the same page cache.
+
+    Categorical columns keep their codes on the mapped arrays too. Read them through
+    `series.array.codes`: `series.cat.codes` and `pd.Categorical(series)` build private copies.
+    """
+    return _map(materialize(csv_path))
+
+
+def share_snapshot(csv_path, df, sequence):
+    """Swap an upserted snapshot for a mapped copy shared by every worker.
+
+    Applying a journal batch builds a new private frame in each worker; the first worker to
+    reach `sequence` materializes it and the others map that copy instead of writing their own.
+    """
+    return _map(materialize(csv_path, df, sequence))
+
+
+def _worker(loader, csv_path, ready, done):
+    import psutil
+
+    df = load_shared(csv_path) if loader == 'shared' else load_dataset(csv_path)
+    # Touch every page of every column, as the dashboard callbacks would
+    for column in df.columns:
+        series = df[column]
+        values = series.array.codes if isinstance(series.dtype, pd.CategoricalDtype) else series.to_numpy()
+        np.ascontiguousarray(values).view(np.uint8).max()
+    memory = psutil.Process().memory_full_info()
+    ready.put((memory.rss, memory.pss, memory.uss))
+    done.wait()
+
+
+# Memory report: per-worker RSS/PSS/USS of N workers with private frames vs the shared mapping
+if __name__ == '__main__':
+    import multiprocessing
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'DATA/infrastructure_deliverables.csv'
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    materialize(csv_path)
+
+    context = multiprocessing.get_context('spawn')
+    for loader in ['private', 'shared']:
+        ready, done = context.Queue(), context.Event()
+        workers = [context.Process(target=_worker, args=(loader, csv_path, ready, done)) for _ in range(n_workers)]
+        for worker in workers:
+            worker.start()
+        # Measure while all workers are alive, so PSS splits the shared pages between them
+        reports = [ready.get(timeout=600) for _ in workers]
+        done.set()
+        for worker in workers:
+            worker.join()
+
+        rss, pss, uss = (np.mean(values) / 2 ** 20 for values in zip(*reports))
+        print(f"{loader:>8}: {n_workers} workers | per-worker RSS {rss:7.1f} MiB | PSS {pss:7.1f} MiB | USS {uss:7.1f} MiB")
@@ -0,0 +1,200 @@
+import argparse
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_store import pq, read_chunks
+
+
+# One-pass summary statistics over numeric columns, accumulated chunk by chunk.
+# For every column pair it keeps, over the rows where both are present, the row count, each
+# column's mean and sum of squared deviations, and the co-moment. Chunks (or whole partial
+# results from other processes) are combined with the pairwise update of Chan et al., the
+# merge form of Welford's algorithm, so memory is bounded by the chunk size and k x k matrices.
+# The diagonal holds the per-column statistics; off-diagonal entries give pairwise-complete
+# covariances and correlations like DataFrame.cov()/corr().
+class StreamingStats:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.rows = 0
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))  # mean of column i over the rows where i and j are present
+        self.m2 = np.zeros((k, k))  # sum of squared deviations of column i over those rows
+        self.comoment = np.zeros((k, k))
+        self.minimum = np.full(k, np.nan)
+        self.maximum = np.full(k, np.nan)
+
+    def _chunk_moments(self, values):
+        present = ~np.isnan(values)
+        # Shift by the chunk's column means to keep the sums small (0 for an all-missing column)
+        counts = present.sum(axis=0)
+        totals = np.where(present, values, 0.0).sum(axis=0)
+        shift = np.divide(totals, counts, out=np.zeros(values.shape[1]), where=counts > 0)
+        if present.all():
+            # No missing values: every pair shares every row, so one product is enough
+            shifted = values - shift
+            ones = np.ones((1, values.shape[1]))
+            n = np.full((values.shape[1],) * 2, float(len(values)))
+            sums = shifted.sum(axis=0)[:, None] * ones
+            sumsq = (shifted * shifted).sum(axis=0)[:, None] * ones
+            cross = shifted.T @ shifted
+        else:
+            mask = present.astype(float)
+            shifted = np.where(present, values - shift, 0.0)
+            n = mask.T @ mask
+            sums = shifted.T @ mask
+            sumsq = (shifted * shifted).T @ mask
+            cross = shifted.T @ shifted
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where(n > 0, sums / n, 0.0)
+        mean = shift[:, None] + offset
+        m2 = sumsq - sums * offset
+        comoment = cross - sums * offset.T
+        return n, np.where(n > 0, mean, 0.0), m2, comoment
+
+    def _combine(self, n, mean, m2, comoment):
+        total = self.n + n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(total > 0, self.n * n / total, 0.0)
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * np.where(total > 0, n / total, 0.0), 0.0)
+        self.m2 = self.m2 + m2 + delta * delta * weight
+        self.comoment = self.comoment + comoment + delta * delta.T * weight
+        self.n = total
+
+    def update(self, chunk):
+        """Add a DataFrame chunk holding (at least) the tracked columns"""
+        values = chunk[self.columns].to_numpy(dtype=float)
+        if len(values) == 0:
+            return self
+        self.rows += len(values)
+        self._combine(*self._chunk_moments(values))
+        # All-missing columns leave min/max at NaN
+        with np.errstate(all='ignore'):
+            present = ~np.isnan(values)
+            low = np.where(present, values, np.inf).min(axis=0)
+            high = np.where(present, values, -np.inf).max(axis=0)
+        low, high = np.where(np.isinf(low), np.nan, low), np.where(np.isinf(high), np.nan, high)
+        self.minimum = np.fmin(self.minimum, low)
+        self.maximum = np.fmax(self.maximum, high)
+        return self
+
+    def merge(self, other):
+        """Fold in the statistics of another accumulator over the same columns (e.g. from another process)"""
+        if other.columns != self.columns:
+            raise ValueError("cannot merge statistics over different columns")
+        self.rows += other.rows
+        self._combine(other.n, other.mean, other.m2, other.comoment)
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+        return self
+
+    def count(self):
+        return pd.Series(np.diag(self.n).astype(np.int64), index=self.columns)
+
+    def means(self):
+        n = np.diag(self.n)
+        return pd.Series(np.where(n > 0, np.diag(self.mean), np.nan), index=self.columns)
+
+    def variances(self, ddof=1):
+        n = np.diag(self.n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(np.where(n > ddof, np.diag(self.m2) / (n - ddof), np.nan), index=self.columns)
+
+    def covariance(self, ddof=1):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = np.where(self.n > ddof, self.comoment / (self.n - ddof), np.nan)
+        return pd.DataFrame(covariance, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Pearson correlation over pairwise-complete rows, like DataFrame.corr()"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        # Undefined for fewer than two shared rows or a constant column
+        correlation[(self.n < 2) | (self.m2 <= 0) | (self.m2.T <= 0)] = np.nan
+        return pd.DataFrame(np.clip(correlation, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+    def describe(self):
+        """count, mean, std, min and max per column, laid out like DataFrame.describe()"""
+        return pd.DataFrame({
+            'count': self.count(),
+            'mean': self.means(),
+            'std': np.sqrt(self.variances()),
+            'min': pd.Series(self.minimum, index=self.columns),
+            'max': pd.Series(self.maximum, index=self.columns)
+        }).T
+
+
+def numeric_columns(path):
+    """Numeric columns of a CSV (judged from its first rows) or Parquet file"""
+    if path.endswith('.parquet'):
+        schema = pq.read_schema(path)
+        return [field.name for field in schema if pd.api.types.is_numeric_dtype(field.type.to_pandas_dtype())]
+    return list(pd.read_csv(path, nrows=1000).select_dtypes(include=['number']).columns)
+
+
+def _row_group_stats(path, columns, row_groups):
+    stats = StreamingStats(columns)
+    parquet_file = pq.ParquetFile(path)
+    for row_group in row_groups:
+        stats.update(parquet_file.read_row_group(row_group, columns=columns).to_pandas())
+    return stats
+
+
+def file_stats(path, columns=None, chunk_size=100_000, workers=1):
+    """Statistics of a CSV or Parquet file in one pass over `chunk_size`-row chunks.
+
+    With `workers` > 1, a Parquet file's row groups are split across processes and the
+    partial results merged; CSV files are read by a single reader.
+    """
+    columns = columns or numeric_columns(path)
+    if workers > 1 and path.endswith('.parquet'):
+        row_groups = np.array_split(np.arange(pq.ParquetFile(path).num_row_groups), workers)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(_row_group_stats, path, columns, list(groups)) for groups in row_groups if len(groups)]
+            stats = StreamingStats(columns)
+            for future in futures:
+                stats.merge(future.result())
+        return stats
+
+    stats = StreamingStats(columns)
+    for chunk in read_chunks(path, chunk_size, columns=columns):
+        stats.update(chunk)
+    return stats
+
+
+# Summary statistics and correlations of a large CSV/Parquet file, optionally checked against pandas
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="One-pass summary statistics of a CSV or Parquet file")
+    parser.add_argument('path')
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1, help="processes for Parquet row groups")
+    parser.add_argument('--check', action='store_true', help="compare with pandas on the fully loaded file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = file_stats(args.path, chunk_size=args.chunk_size, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    pd.set_option('display.width', 200)
+    print(stats.describe().to_string(float_format=lambda value: f'{value:,.4g}'))
+    print(stats.correlation().round(3).to_string())
+    print(f"{stats.rows:,} rows in {elapsed:.2f} s | peak RSS {peak_mb:.0f} MiB")
+
+    if args.check:
+        df = pd.read_parquet(args.path) if args.path.endswith('.parquet') else pd.read_csv(args.path)
+        numeric = df[stats.columns]
+        reference = numeric.describe().loc[['count', 'mean', 'std', 'min', 'max']]
+        print(f"describe max relative error: "
+              f"{np.nanmax(np.abs(stats.describe() - reference) / np.abs(reference).clip(lower=1e-12)).max():.2e}")
+        print(f"corr max abs error: {np.nanmax(np.abs(stats.correlation() - numeric.corr()).to_numpy()):.2e}")
+        print(f"cov max relative error: "
+              f"{np.nanmax((np.abs(stats.covariance() - numeric.cov()) / np.abs(numeric.cov())).to_numpy()):.2e}")
@@ -0,0 +1,130 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import CategoryBitmapIndex
+
+# Measures the KPI cards aggregate
+MEASURES = ['Project Budget (KES)', 'Completion Percentage', 'Population Density', 'Growth Rate']
+
+
+# Aggregation cube keyed by (Project Type, Project Status).
+# Every cell stores the row count and, per measure, the non-null count, sum and sum of
+# squares, so any filter on the two dimensions is answered by adding up selected cells.
+# The last slot on each axis holds rows whose category is missing.
+class SummaryCube:
+    def __init__(self, df, index=None, measures=MEASURES):
+        self.index = index if index is not None else CategoryBitmapIndex(df)
+        self.row_dim, self.col_dim = self.index.columns[:2]
+        self.row_labels = self.index.categories[self.row_dim]
+        self.col_labels = self.index.categories[self.col_dim]
+        self.shape = (len(self.row_labels) + 1, len(self.col_labels) + 1)
+
+        row_codes = self._slots(self.index.codes[self.row_dim], len(self.row_labels))
+        col_codes = self._slots(self.index.codes[self.col_dim], len(self.col_labels))
+        # Flat cell id of every row, reused by other per-cell aggregates (e.g. histograms)
+        self.cell_ids = row_codes * self.shape[1] + col_codes
+
+        self.measures = [
+            # Categorical measures (e.g. 'Low'/'High' density levels) cannot be summed
+            measure for measure in measures
+            if measure in df.columns and pd.api.types.is_numeric_dtype(df[measure])
+        ]
+        self.count, self.n, self.sum, self.sumsq = self._accumulate(df, self.cell_ids)
+
+    def _accumulate(self, df, cell_ids):
+        count = self._bincount(cell_ids)
+        n, sums, sumsq = {}, {}, {}
+        for measure in self.measures:
+            values = pd.to_numeric(df[measure]).to_numpy(dtype=float)
+            present = ~np.isnan(values)
+            values = np.where(present, values, 0.0)
+            n[measure] = self._bincount(cell_ids, present.astype(float))
+            sums[measure] = self._bincount(cell_ids, values)
+            sumsq[measure] = self._bincount(cell_ids, values * values)
+        return count, n, sums, sumsq
+
+    def row_cells(self, df):
+        """Flat cell id of each row of `df`, or None if it holds a category the cube has no cell for"""
+        slots = []
+        for dim, labels in [(self.row_dim, self.row_labels), (self.col_dim, self.col_labels)]:
+            codes = pd.Categorical(df[dim], categories=labels).codes
+            if ((codes < 0) & df[dim].notna().to_numpy()).any():
+                return None
+            slots.append(self._slots(codes, len(labels)))
+        return slots[0] * self.shape[1] + slots[1]
+
+    def updated(self, removed, added):
+        """Return a copy of the cube with `removed` rows taken out and `added` rows put in.
+
+        Only the cells those rows fall into change. Returns None when added rows bring a
+        category the cube has no cell for, in which case the cube has to be rebuilt.
+        """
+        cube = copy.copy(self)
+        # Cell ids describe the rows the cube was built from
+        cube.cell_ids = None
+        cube.count = self.count.copy()
+        cube.n = {measure: values.copy() for measure, values in self.n.items()}
+        cube.sum = {measure: values.copy() for measure, values in self.sum.items()}
+        cube.sumsq = {measure: values.copy() for measure, values in self.sumsq.items()}
+
+        for rows, sign in [(removed, -1), (added, 1)]:
+            if rows is None or len(rows) == 0:
+                continue
+            cell_ids = self.row_cells(rows)
+            if cell_ids is None:
+                return None
+            count, n, sums, sumsq = self._accumulate(rows, cell_ids)
+            cube.count += sign * count
+            for measure in self.measures:
+                cube.n[measure] += sign * n[measure]
+                cube.sum[measure] += sign * sums[measure]
+                cube.sumsq[measure] += sign * sumsq[measure]
+        return cube
+
+    @staticmethod
+    def _slots(codes, n_categories):
+        return np.where(codes < 0, n_categories, codes).astype(np.int64)
+
+    def _bincount(self, cell_ids, weights=None):
+        size = self.shape[0] * self.shape[1]
+        return np.bincount(cell_ids, weights=weights, minlength=size).reshape(self.shape)
+
+    def _selector(self, labels, values):
+        if not values:
+            return np.ones(len(labels) + 1, dtype=bool)
+        selector = np.zeros(len(labels) + 1, dtype=bool)
+        positions = {label: i for i, label in enumerate(labels)}
+        for value in values:
+            if value in positions:
+                selector[positions[value]] = True
+        return selector
+
+    def cells(self, selected_rows, selected_cols):
+        """Return an np.ix_ selector for the cells matching the two filters"""
+        return np.ix_(self._selector(self.row_labels, selected_rows),
+                      self._selector(self.col_labels, selected_cols))
+
+    def summarize(self, selected_rows, selected_cols, fill_na=False):
+        """Totals for a selection; fill_na=True treats missing values as 0 (rows as the denominator)"""
+        cells = self.cells(selected_rows, selected_cols)
+        count = int(self.count[cells].sum())
+        summary = {'count': count, 'sum': {}, 'mean': {}, 'var': {}}
+        for measure in self.measures:
+            total = self.sum[measure][cells].sum()
+            total_sq = self.sumsq[measure][cells].sum()
+            n = count if fill_na else self.n[measure][cells].sum()
+            summary['sum'][measure] = total
+            summary['mean'][measure] = total / n if n else np.nan
+            summary['var'][measure] = (total_sq - total * total / n) / (n - 1) if n > 1 else np.nan
+        return summary
+
+    def col_counts(self, selected_rows, selected_cols):
+        """Row counts per column category, sorted like Series.value_counts()"""
+        row_selector = self._selector(self.row_labels, selected_rows)
+        col_selector = self._selector(self.col_labels, selected_cols)[:-1]
+        counts = self.count[row_selector].sum(axis=0)[:-1]
+        counts = pd.Series(counts, index=pd.Index(self.col_labels, name=self.col_dim), name='count')
+        counts = counts[col_selector & (counts > 0)]
+        return counts.sort_values(ascending=False, kind='stable')
@@ -0,0 +1,67 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, confusion_matrix
+from sklearn.model_selection import train_test_split
+
+from data_store import load_dataset
+from generators.features import FeatureBuilder
+from model_artifacts import save_artifacts
+
+NUMERIC = ['Completion Percentage', 'Project Budget (KES)']
+
+# Models trained from the infrastructure deliverables dataset: the categorical features
+# and how the binary target is derived from a row
+MODELS = {
+    'delay': {
+        'categorical': ['Project Type', 'Infrastructure Level', 'Population Density', 'Growth Rate'],
+        'target': lambda df: (df['Project Status'] == 'Delayed').astype(int),
+        'labels': ['Not Delayed', 'Delayed']
+    },
+    'need': {
+        'categorical': ['Project Type', 'Project Status', 'Infrastructure Level', 'Population Density', 'Growth Rate'],
+        'target': lambda df: df['Need New Infrastructure'].astype(int),
+        'labels': ['No Need', 'Need']
+    }
+}
+
+
+def train(df, name, random_state=42):
+    spec = MODELS[name]
+    encoder = FeatureBuilder(categorical=spec['categorical'], numeric=NUMERIC, scale_numeric=False)
+    X = encoder.fit_transform_sparse(df).toarray()
+    y = spec['target'](df).to_numpy()
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=random_state)
+    model = RandomForestClassifier(random_state=random_state, n_jobs=-1)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    importances = pd.DataFrame({'feature': encoder.feature_names_, 'importance': model.feature_importances_})
+    metrics = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'confusion_matrix': confusion_matrix(y_test, y_pred, labels=[0, 1]),
+        'labels': spec['labels'],
+        'feature_importances': importances.sort_values('importance', ascending=False, ignore_index=True),
+        'train_rows': len(y_train),
+        'positive_rate': float(np.mean(y))
+    }
+    # Scoring runs single-threaded per request; callers can raise n_jobs after loading
+    model.set_params(n_jobs=None)
+    return model, encoder, metrics
+
+
+# Fit the models once and save them for the dashboards and the scoring entry point
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the delay and need-for-infrastructure models")
+    parser.add_argument('--data', default='DATA/infrastructure_deliverables.csv')
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS))
+    args = parser.parse_args()
+
+    df = load_dataset(args.data)
+    for name in args.models:
+        model, encoder, metrics = train(df, name)
+        path = save_artifacts(name, model, encoder, metrics)
+        print(f"{name}: accuracy {metrics['accuracy']:.4f} on the test split -> {path}")
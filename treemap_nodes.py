@@ -0,0 +1,96 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+# Treemap hierarchy rolled up once at load into a compact node table (ids, parents, values).
+# The dashboard filters on the first two levels of the path, so a filter state masks the
+# table's nodes and only re-sums the top level, which never touches the raw rows.
+class TreemapNodes:
+    def __init__(self, df, path=('Project Type', 'Project Status', 'Settlement Name'),
+                 values='Project Budget (KES)'):
+        path = list(path)
+        leaves = df.groupby(path, observed=True, sort=True)[values].sum().reset_index()
+
+        levels = []
+        for depth in range(1, len(path) + 1):
+            level = leaves.groupby(path[:depth], observed=True, sort=True)[values].sum().reset_index()
+            keys = level[path[:depth]].astype(str)
+            level['id'] = keys.agg('/'.join, axis=1)
+            level['parent'] = keys[path[:depth - 1]].agg('/'.join, axis=1) if depth > 1 else ''
+            level['label'] = keys[path[depth - 1]]
+            level['depth'] = depth
+            levels.append(level)
+
+        nodes = pd.concat(levels, ignore_index=True)
+        self.path = path
+        self.value_column = values
+        self.ids = nodes['id'].to_numpy()
+        self.parents = nodes['parent'].to_numpy()
+        self.labels = nodes['label'].to_numpy()
+        self.values = nodes[values].to_numpy(dtype=float)
+        self.depth = nodes['depth'].to_numpy()
+        # Filter keys of every node; nodes above a level have no value for it
+        self.keys = {column: nodes[column].astype(object).to_numpy() for column in path[:2]}
+
+        # Position of each node's parent (-1 at the top level), for re-summing the top level
+        positions = pd.Series(np.arange(len(nodes)), index=self.ids)
+        self.positions = positions
+        self.parent_positions = np.full(len(nodes), -1)
+        children = self.depth > 1
+        self.parent_positions[children] = positions[self.parents[children]].to_numpy()
+
+    def updated(self, removed, added):
+        """Return a copy with the values of the nodes `removed` and `added` rows roll up into adjusted.
+
+        Returns None when an added row belongs to a node the table does not have yet, in
+        which case the node table has to be rebuilt.
+        """
+        nodes = copy.copy(self)
+        nodes.values = self.values.copy()
+
+        for rows, sign in [(removed, -1), (added, 1)]:
+            if rows is None or len(rows) == 0:
+                continue
+            # Roll the rows up to their leaves first; groupby leaves out rows with a missing path value
+            leaves = rows.groupby(self.path, observed=True)[self.value_column].sum().reset_index()
+            if len(leaves) == 0:
+                continue
+            values = leaves[self.value_column].to_numpy(dtype=float)
+            ids = None
+            for column in self.path:
+                key = leaves[column].astype(str)
+                ids = key if ids is None else ids + '/' + key
+                positions = self.positions.reindex(ids.to_numpy()).to_numpy()
+                if np.isnan(positions).any():
+                    return None
+                np.add.at(nodes.values, positions.astype(np.int64), sign * values)
+        return nodes
+
+    def select(self, selected_first, selected_second):
+        """Return (ids, parents, labels, values) of the nodes visible for a filter state"""
+        first_column, second_column = self.path[:2]
+        visible = np.ones(len(self.ids), dtype=bool)
+        if selected_first:
+            visible &= np.isin(self.keys[first_column], list(selected_first))
+        values = self.values
+        if selected_second:
+            visible &= (self.depth < 2) | np.isin(self.keys[second_column], list(selected_second))
+            # Top-level totals only include the second-level nodes still visible
+            kept = np.flatnonzero(visible & (self.depth == 2))
+            top_level = self.depth == 1
+            values = values.copy()
+            values[top_level] = np.bincount(self.parent_positions[kept], weights=values[kept],
+                                            minlength=len(values))[top_level]
+            has_children = np.bincount(self.parent_positions[kept], minlength=len(values)) > 0
+            visible &= ~top_level | has_children
+        return self.ids[visible], self.parents[visible], self.labels[visible], values[visible]
+
+    def figure(self, selected_first, selected_second, title=None):
+        ids, parents, labels, values = self.select(selected_first, selected_second)
+        fig = go.Figure(go.Treemap(ids=ids, parents=parents, labels=labels, values=values,
+                                   branchvalues='total'))
+        fig.update_layout(title=title)
+        return fig